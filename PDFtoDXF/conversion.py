@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Page conversion used by the algorithm and by its worker processes.
+Worker processes run a plain Python interpreter, so this module must not import qgis.
+"""
+import io
+
+from . import geometry, profiling
+
+# Drawing items converted between two cancellation checks
+CANCEL_CHECK_INTERVAL = 5000
+
+
+class ConversionCanceled(Exception):
+    """Raised when the user cancels the conversion."""
+
+
+def check_canceled(is_canceled):
+    if is_canceled is not None and is_canceled():
+        raise ConversionCanceled()
+
+
+def new_dxf(ezdxf):
+    """New DXF document with the output layers."""
+    dxf = ezdxf.new()
+    dxf.layers.new(name='PDF_GEOMETRY', dxfattribs={'color': 7})
+    dxf.layers.new(name='PDF_TEXT', dxfattribs={'color': 1})
+    return dxf
+
+
+def save_dxf(dxf, path, binary=False):
+    """Saves dxf to path, or returns its encoded content if path is None."""
+    if path is not None:
+        dxf.saveas(path, fmt="bin" if binary else "asc")
+        return None
+    if binary:
+        stream = io.BytesIO()
+        dxf.write(stream, fmt="bin")
+        return stream.getvalue()
+    text_stream = io.StringIO()
+    dxf.write(text_stream)
+    return dxf.encode(text_stream.getvalue())
+
+
+def convert_page(page, msp, profile=None, is_canceled=None, clip=None):
+    """
+    Adds the drawings and text of page to msp.
+    :param is_canceled: Optional callable, checked regularly; raises ConversionCanceled when it returns True.
+    :param clip: Optional region to convert, "cropbox" or an (x0, y0, x1, y1) box, see geometry.clip_box().
+    :return: Number of text entities added.
+    """
+    matrix = geometry.page_matrix(page.rect.height, 0)
+    page_num = page.number
+    box = geometry.clip_box(page, clip)
+
+    # 1. Extract Drawings
+    with profiling.stage(profile, page_num, "get_drawings") as stage:
+        paths = geometry.get_paths(page)
+        if box is not None:
+            paths = geometry.cull_paths(paths, box)
+        stage.count = len(paths)
+    check_canceled(is_canceled)
+
+    # All vertices of the page are transformed in one vectorized step
+    with profiling.stage(profile, page_num, "transform") as stage:
+        items = geometry.collect_items(paths)
+        items.points = geometry.transform_points(items.points, matrix)
+        stage.count = len(items.points)
+    del paths
+
+    with profiling.stage(profile, page_num, "geometry") as stage:
+        for index, (cmd, path_id, points) in enumerate(items):
+            if index % CANCEL_CHECK_INTERVAL == 0:
+                check_canceled(is_canceled)
+            if cmd == "l":
+                msp.add_line(points[0], points[1], dxfattribs={'layer': 'PDF_GEOMETRY'})
+            elif cmd == "c":
+                msp.add_spline(points, degree=3, dxfattribs={'layer': 'PDF_GEOMETRY'})
+            elif cmd == "re":
+                msp.add_lwpolyline(points, dxfattribs={'layer': 'PDF_GEOMETRY'})
+        stage.count = len(items)
+    del items
+    check_canceled(is_canceled)
+
+    # 2. Extract Text
+    import fitz  # Already loaded by the caller
+    with profiling.stage(profile, page_num, "get_text") as stage:
+        # Without TEXT_PRESERVE_IMAGES, so images are not decoded into the result
+        text_dict = page.get_text("dict", clip=box, flags=fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES)
+        stage.count = len(text_dict.get("blocks", []))
+
+    with profiling.stage(profile, page_num, "text") as stage:
+        spans = []
+        for block in text_dict.get("blocks", []):
+            if block["type"] == 0: # Text block
+                for line in block["lines"]:
+                    for span in line["spans"]:
+                        if span["text"].strip():
+                            spans.append(span)
+
+        if spans:
+            origins = geometry.as_points([span["origin"] for span in spans])
+            insert_points = geometry.transform_points(origins, matrix).tolist()
+            for span, insert_point in zip(spans, insert_points):
+                msp.add_mtext(
+                    span["text"],
+                    dxfattribs={
+                        'char_height': span["size"],
+                        'insert': insert_point,
+                        'attachment_point': 7, # BottomLeft
+                        'layer': 'PDF_TEXT'
+                    }
+                )
+        stage.count = len(spans)
+    return len(spans)
+
+
+def convert_page_job(pdf_path, page_num, output_path, profile_enabled=False, binary=False, clip=None):
+    """
+    Process pool entry point: converts one page in its own copy of the PDF.
+    :param output_path: DXF path, or None to return the DXF content instead.
+    :return: (text count, recorded page stages or None, DXF bytes or None)
+    """
+    import fitz
+    import ezdxf
+
+    profile = profiling.ConversionProfile() if profile_enabled else None
+    doc = fitz.open(pdf_path)
+    try:
+        dxf = new_dxf(ezdxf)
+        text_count = convert_page(doc[page_num], dxf.modelspace(), profile, clip=clip)
+        with profiling.stage(profile, page_num, "save"):
+            data = save_dxf(dxf, output_path, binary)
+    finally:
+        doc.close()
+    return text_count, profile.pages if profile else None, data
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import importlib.util
 import sys
 import subprocess
 import os
@@ -26,30 +27,82 @@ def get_ezdxf_requirement():
     except Exception:
         return "ezdxf<1.1"
 
-def check_missing():
+def get_python_executable():
+    """
+    Locates the Python interpreter of the QGIS installation.
+    Inside QGIS, sys.executable is usually the QGIS application itself.
+    """
+    if sys.platform == 'win32':
+        candidates = [
+            os.path.join(sys.exec_prefix, 'python.exe'),
+            os.path.join(sys.exec_prefix, 'bin', 'python.exe'),
+            os.path.join(os.path.dirname(sys.executable), 'python-qgis-ltr.exe'),
+            sys.executable
+        ]
+    else:
+        candidates = [
+            sys.executable,
+            os.path.join(sys.exec_prefix, 'bin', f'python{sys.version_info[0]}.{sys.version_info[1]}'),
+            os.path.join(sys.exec_prefix, 'bin', 'python3'),
+        ]
+
+    for c in candidates:
+        if os.path.exists(c) and 'python' in os.path.basename(c).lower():
+            return c
+
+    if 'python' in os.path.basename(sys.executable).lower():
+        return sys.executable
+    return os.path.join(sys.exec_prefix, 'python.exe')
+
+def is_installed(module_name, attribute=None):
+    """
+    Checks whether a module can be imported, without importing it.
+    A module that is already loaded must also have attribute.
+    """
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return attribute is None or hasattr(module, attribute)
+    try:
+        return importlib.util.find_spec(module_name) is not None
+    except (ImportError, ValueError):
+        return False
+
+def check_missing(import_modules=False):
+    """
+    Lists the dependencies to install.
+    By default the packages are only looked up, so that QGIS start-up does not
+    pay for importing PyMuPDF and ezdxf. With import_modules they are imported,
+    which also catches a wrong 'fitz' package and an installed but broken ezdxf
+    (e.g. the numpy.typing error of ezdxf>=1.1 on old numpy), so that the pinned
+    ezdxf is offered; use it before converting or installing.
+    """
+    if not import_modules:
+        missing = []
+        if not is_installed('fitz', 'open'):
+            missing.append('pymupdf')
+        if not is_installed('ezdxf'):
+            missing.append(get_ezdxf_requirement())
+        return missing
+
     missing = []
     try:
         import fitz
         # Verify it's the correct fitz (PyMuPDF) and not another package named fitz
         if not hasattr(fitz, 'open'):
-             missing.append('pymupdf')
+            missing.append('pymupdf')
     except ImportError:
         missing.append('pymupdf')
-    
+
     try:
         import ezdxf
-    except ImportError:
-        missing.append(get_ezdxf_requirement())
-    except AttributeError:
-        # Catch the numpy.typing error if it happens during import
-        missing.append(get_ezdxf_requirement())
     except Exception:
+        # Not installed, or e.g. the numpy.typing error of newer ezdxf on old numpy
         missing.append(get_ezdxf_requirement())
-    
     return missing
 
 def install_deps(iface):
-    missing = check_missing()
+    # Imports the packages, which also catches an installed but broken ezdxf
+    missing = check_missing(import_modules=True)
     if not missing:
         return True
 
@@ -66,27 +119,7 @@ def install_deps(iface):
     if reply == QMessageBox.StandardButton.No:
         return False
 
-    # Locate python executable
-    python_exe = None
-    if sys.platform == 'win32':
-        candidates = [
-            os.path.join(sys.exec_prefix, 'python.exe'),
-            os.path.join(sys.exec_prefix, 'bin', 'python.exe'),
-            os.path.join(os.path.dirname(sys.executable), 'python-qgis-ltr.exe'),
-            sys.executable
-        ]
-        
-        for c in candidates:
-            if os.path.exists(c) and 'python' in os.path.basename(c).lower():
-                python_exe = c
-                break
-    
-    if not python_exe:
-        if 'python' in os.path.basename(sys.executable).lower():
-            python_exe = sys.executable
-        else:
-            python_exe = os.path.join(sys.exec_prefix, 'python.exe')
-
+    python_exe = get_python_executable()
     QgsMessageLog.logMessage(f"PDF2DXF: Using python: {python_exe}", "PDF2DXF", Qgis.Info)
 
     try:
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+# Number of points stored per drawing command ("re" is expanded to a closed loop)
+ITEM_POINTS = {"l": 2, "c": 4, "re": 5}
+
+
+class PageItems:
+    """
+    Flat, array-backed view of the line, curve and rect items of a page.
+    All vertices live in a single (N, 2) float array so they can be
+    transformed in one vectorized operation.
+    """
+
+    def __init__(self, cmds, path_ids, counts, points):
+        self.cmds = cmds
+        self.path_ids = path_ids
+        self.counts = counts
+        self.points = points
+
+    def __len__(self):
+        return len(self.cmds)
+
+    def __iter__(self):
+        """Yields (cmd, path_id, points) per item, points as a list of [x, y]."""
+        coords = self.points.tolist()
+        start = 0
+        for cmd, path_id, count in zip(self.cmds, self.path_ids, self.counts):
+            yield cmd, path_id, coords[start:start + count]
+            start += count
+
+
+def get_paths(page, extractor="cdrawings"):
+    """
+    Returns the drawing paths of page in get_drawings() layout.
+    "cdrawings" reads them with page.get_cdrawings(), which gives plain tuples
+    instead of Point/Rect objects and skips the fill details; it falls back to
+    get_drawings() on PyMuPDF versions without it.
+    """
+    if extractor == "cdrawings" and hasattr(page, "get_cdrawings"):
+        return page.get_cdrawings()
+    return page.get_drawings()
+
+
+def collect_items(paths):
+    """
+    Collects the vertices of all "l", "c" and "re" items of get_drawings() paths.
+    :param paths: Output of get_paths(), items may hold Point/Rect objects or tuples.
+    :return: PageItems in drawing order.
+    """
+    cmds = []
+    path_ids = []
+    counts = []
+    coords = []
+    for path_id, path in enumerate(paths):
+        for item in path["items"]:
+            cmd = item[0]
+            if cmd == "l":
+                coords.extend(item[1])
+                coords.extend(item[2])
+            elif cmd == "c":
+                for p in item[1:5]:
+                    coords.extend(p)
+            elif cmd == "re":
+                x0, y0, x1, y1 = item[1]
+                coords.extend((x0, y0, x1, y0, x1, y1, x0, y1, x0, y0)) # Closed loop
+            else:
+                continue
+            cmds.append(cmd)
+            path_ids.append(path_id)
+            counts.append(ITEM_POINTS[cmd])
+
+    return PageItems(cmds, path_ids, counts, as_points(coords))
+
+
+def clip_box(page, clip):
+    """
+    Returns the clip region of page as (x0, y0, x1, y1) in the unrotated page
+    coordinates of get_drawings() and get_text(), or None to keep everything.
+    :param clip: None, "cropbox" for the visible page area, or an (x0, y0, x1, y1)
+                 box in PDF points from the top-left corner of the unrotated page.
+    """
+    if clip is None:
+        return None
+    if clip == "cropbox":
+        return tuple(page.rect * page.derotation_matrix)
+    return tuple(clip)
+
+
+def cull_paths(paths, box):
+    """Keeps the get_drawings() paths whose bounding rect touches box (x0, y0, x1, y1)."""
+    x0, y0, x1, y1 = box
+    kept = []
+    for path in paths:
+        # A Rect or, from get_cdrawings(), a tuple
+        left, top, right, bottom = path["rect"]
+        if right >= x0 and left <= x1 and bottom >= y0 and top <= y1:
+            kept.append(path)
+    return kept
+
+
+def as_points(coords):
+    """Builds an (N, 2) float array from a flat or nested sequence of coordinates."""
+    return np.array(coords, dtype=np.float64).reshape(-1, 2)
+
+
+def page_matrix(page_height, x_offset=0):
+    """
+    Returns the (a, b, c, d, e, f) matrix that flips PDF page coordinates
+    (origin top-left) to DXF coordinates (origin bottom-left).
+    """
+    return (1.0, 0.0, 0.0, -1.0, float(x_offset), float(page_height))
+
+
+def transform_points(points, matrix):
+    """
+    Applies an affine matrix (a, b, c, d, e, f), as used by PyMuPDF, to an
+    (N, 2) array of points: x' = a*x + c*y + e, y' = b*x + d*y + f.
+    """
+    a, b, c, d, e, f = matrix
+    x = points[:, 0]
+    y = points[:, 1]
+    if (a, b, c, d) == (1.0, 0.0, 0.0, -1.0):
+        # Plain Y-flip (the default), no need for the full multiply-add
+        return np.column_stack((x + e, f - y))
+    return np.column_stack((a * x + c * y + e, b * x + d * y + f))
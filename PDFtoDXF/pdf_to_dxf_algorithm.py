@@ -6,35 +6,32 @@ from qgis.core import (QgsProcessing,
                        QgsProcessingParameterFile,
                        QgsProcessingParameterFileDestination,
                        QgsProcessingParameterBoolean,
+                       QgsProcessingParameterNumber,
+                       QgsProcessingParameterString,
                        QgsProcessingException,
                        QgsProcessingContext,
                        QgsMessageLog,
                        Qgis)
+import multiprocessing
 import sys
 import os
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait
 from . import dependencies
 
-# --- Dependency Handling ---
-# --- Dependency Handling ---
-MISSING_DEPS = []
-
-try:
-    import fitz
-    if not hasattr(fitz, 'open'):
-        MISSING_DEPS.append('pymupdf')
-except ImportError:
-    MISSING_DEPS.append('pymupdf')
-
-try:
-    import ezdxf
-except (ImportError, AttributeError, Exception):
-    MISSING_DEPS.append('ezdxf')
-
 class PdfToDxfAlgorithm(QgsProcessingAlgorithm):
     INPUT = 'INPUT'
     OUTPUT = 'OUTPUT'
 
     LOAD_OUTPUT = 'LOAD_OUTPUT'
+    PROFILE = 'PROFILE'
+    ARCHIVE = 'ARCHIVE'
+    COMPRESSION_LEVEL = 'COMPRESSION_LEVEL'
+    WORKERS = 'WORKERS'
+    BINARY = 'BINARY'
+    CLIP_TO_PAGE = 'CLIP_TO_PAGE'
+    CLIP_BOX = 'CLIP_BOX'
 
     def tr(self, string):
         return QCoreApplication.translate('Processing', string)
@@ -90,15 +87,79 @@ class PdfToDxfAlgorithm(QgsProcessingAlgorithm):
             )
         )
 
+        self.addParameter(
+            QgsProcessingParameterBoolean(
+                self.PROFILE,
+                self.tr('Report per-stage timings'),
+                defaultValue=False
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterBoolean(
+                self.BINARY,
+                self.tr('Write binary DXF (smaller files, faster to load)'),
+                defaultValue=False
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterBoolean(
+                self.CLIP_TO_PAGE,
+                self.tr('Drop content outside the page area (CropBox)'),
+                defaultValue=False
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterString(
+                self.CLIP_BOX,
+                self.tr('Only convert a box: x0,y0,x1,y1 in PDF points from the top-left corner'),
+                optional=True
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterBoolean(
+                self.ARCHIVE,
+                self.tr('Write all pages into one ZIP archive'),
+                defaultValue=False
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.COMPRESSION_LEVEL,
+                self.tr('ZIP compression level (0-9)'),
+                type=QgsProcessingParameterNumber.Integer,
+                minValue=0,
+                maxValue=9,
+                defaultValue=6
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.WORKERS,
+                self.tr('Worker processes for multi-page PDFs (0 = one per CPU)'),
+                type=QgsProcessingParameterNumber.Integer,
+                minValue=0,
+                defaultValue=1
+            )
+        )
+
     def processAlgorithm(self, parameters, context, feedback):
 
-        if MISSING_DEPS:
+        # PyMuPDF and ezdxf are only imported when a conversion runs, which also
+        # catches an installed but broken ezdxf that the start-up check lets through
+        missing = dependencies.check_missing(import_modules=True)
+        if missing:
              ezdxf_req = dependencies.get_ezdxf_requirement()
              # Escape for HTML display
              ezdxf_req_display = ezdxf_req.replace('<', '&lt;').replace('>', '&gt;')
              raise QgsProcessingException(
-                self.tr(f"Missing dependencies: {', '.join(MISSING_DEPS)}.\n\n"
-                        "The plugin attempts to install these automatically.\n"
+                self.tr(f"Missing dependencies: {', '.join(missing)}.\n\n"
+                        "The plugin offers to install these when QGIS starts.\n"
                         "If that failed, please install manually using OSGeo4W Shell:\n"
                         f'pip install pymupdf "{ezdxf_req_display}"\n'
                         "Then restart QGIS.")
@@ -107,6 +168,20 @@ class PdfToDxfAlgorithm(QgsProcessingAlgorithm):
         source_path = self.parameterAsFile(parameters, self.INPUT, context)
         output_path = self.parameterAsString(parameters, self.OUTPUT, context)
         load_output = self.parameterAsBool(parameters, self.LOAD_OUTPUT, context)
+        profile_enabled = self.parameterAsBool(parameters, self.PROFILE, context)
+        archive = self.parameterAsBool(parameters, self.ARCHIVE, context)
+        compression_level = self.parameterAsInt(parameters, self.COMPRESSION_LEVEL, context)
+        workers = self.parameterAsInt(parameters, self.WORKERS, context) or os.cpu_count() or 1
+        binary = self.parameterAsBool(parameters, self.BINARY, context)
+        clip = "cropbox" if self.parameterAsBool(parameters, self.CLIP_TO_PAGE, context) else None
+        clip_box = self.parameterAsString(parameters, self.CLIP_BOX, context)
+        if clip_box:
+            try:
+                clip = [float(v) for v in clip_box.split(",")]
+            except ValueError:
+                clip = []
+            if len(clip) != 4 or clip[0] >= clip[2] or clip[1] >= clip[3]:
+                raise QgsProcessingException(self.tr(f'Invalid clip box "{clip_box}", expected x0,y0,x1,y1.'))
 
         if not source_path:
             raise QgsProcessingException(self.tr('Invalid input PDF.'))
@@ -125,7 +200,20 @@ class PdfToDxfAlgorithm(QgsProcessingAlgorithm):
             except (ImportError, AttributeError, Exception):
                  raise ImportError("Incompatible 'ezdxf' version. Please reinstall dependencies.")
             import ezdxf
-            generated_files = self.convert_pdf_to_dxf(source_path, output_path, fitz, ezdxf)
+            from . import conversion, profiling
+            profile = profiling.ConversionProfile() if profile_enabled else None
+            try:
+                generated_files = self.convert_pdf_to_dxf(source_path, output_path, fitz, ezdxf, profile,
+                                                          archive, compression_level, feedback, workers,
+                                                          binary, clip)
+            except conversion.ConversionCanceled:
+                feedback.pushInfo(self.tr("Conversion canceled."))
+                return {}
+            if profile is not None:
+                feedback.pushInfo(profile.summary())
+                for page_num, stages in profile.report()['pages'].items():
+                    feedback.pushInfo(f"Page {page_num + 1}: " + ", ".join(
+                        f"{name} {values['seconds']:.3f}s" for name, values in stages.items()))
             
             if load_output:
                 # Load layers into project
@@ -142,112 +230,117 @@ class PdfToDxfAlgorithm(QgsProcessingAlgorithm):
 
         return {self.OUTPUT: output_path}
 
-    def convert_pdf_to_dxf(self, pdf_path, dxf_path, fitz, ezdxf):
+    def convert_pdf_to_dxf(self, pdf_path, dxf_path, fitz, ezdxf, profile=None,
+                           archive=False, compression_level=6, feedback=None, workers=1, binary=False,
+                           clip=None):
+        """
+        Converts every page of pdf_path, into separate files for multi-page PDFs.
+        :param feedback: Optional QgsProcessingFeedback for per-page progress and cancellation.
+        :param workers: Number of worker processes for multi-page PDFs.
+        :param binary: Write binary instead of ASCII DXF.
+        :param clip: Only convert "cropbox" (the page area) or an (x0, y0, x1, y1) box of each page.
+        :return: List of generated files (GDAL /vsizip/ paths in archive mode).
+        """
         if not os.path.exists(pdf_path):
             raise FileNotFoundError(f"PDF file not found: {pdf_path}")
             
         doc = fitz.open(pdf_path)
         generated_files = []
-        
+        is_canceled = feedback.isCanceled if feedback is not None else None
+
         # If multiple pages, save separate files
         if len(doc) > 1:
             base, ext = os.path.splitext(dxf_path)
-            for page_num in range(len(doc)):
-                dxf = ezdxf.new()
-                # Create layers
-                dxf.layers.new(name='PDF_GEOMETRY', dxfattribs={'color': 7})
-                dxf.layers.new(name='PDF_TEXT', dxfattribs={'color': 1})
-                
-                msp = dxf.modelspace()
-                
-                page = doc[page_num]
-                self._convert_single_page(page, msp)
-                
-                page_output_path = f"{base}_page_{page_num + 1}{ext}"
-                dxf.saveas(page_output_path)
-                generated_files.append(page_output_path)
+            jobs = [(page_num, f"{base}_page_{page_num + 1}{ext}") for page_num in range(len(doc))]
         else:
-            # Single page
-            dxf = ezdxf.new()
-            # Create layers
-            dxf.layers.new(name='PDF_GEOMETRY', dxfattribs={'color': 7})
-            dxf.layers.new(name='PDF_TEXT', dxfattribs={'color': 1})
-            
-            msp = dxf.modelspace()
-            if len(doc) > 0:
-                self._convert_single_page(doc[0], msp)
-            dxf.saveas(dxf_path)
-            generated_files.append(dxf_path)
+            jobs = [(0 if len(doc) else None, dxf_path)]
+
+        zip_file = None
+        if archive:
+            # Each page is added to the ZIP as soon as it is done, then freed
+            zip_path = os.path.splitext(dxf_path)[0] + ".zip"
+            compression = zipfile.ZIP_DEFLATED if compression_level > 0 else zipfile.ZIP_STORED
+            zip_file = zipfile.ZipFile(zip_path, 'w', compression, compresslevel=compression_level or None)
+
+        try:
+            if workers > 1 and len(jobs) > 1:
+                doc.close()
+                results = self._run_pool(pdf_path, jobs, workers, archive, profile, is_canceled, binary, clip)
+            else:
+                results = self._iter_pages(doc, jobs, ezdxf, archive, profile, is_canceled, binary, clip)
+
+            for done, (page_num, path, text_count, data) in enumerate(results, 1):
+                if zip_file is None:
+                    generated_files.append(path)
+                else:
+                    name = os.path.basename(path)
+                    zip_file.writestr(name, data)
+                    # GDAL virtual path, so the pages can be loaded straight from the archive
+                    generated_files.append(f"/vsizip/{zip_path}/{name}")
+                del data
+
+                QgsMessageLog.logMessage(f"PDF2DXF: Found {text_count} text objects on page.", "PDF2DXF", Qgis.Info)
+                if feedback is not None:
+                    feedback.setProgress(100.0 * done / len(jobs))
+                    feedback.setProgressText(self.tr(f"Converted page {done} of {len(jobs)}"))
+        finally:
+            if zip_file is not None:
+                zip_file.close()
+            if not doc.is_closed:
+                doc.close()
             
         return generated_files
 
-    def _convert_single_page(self, page, msp):
-        # 1. Extract Drawings
-        paths = page.get_drawings()
-        page_height = page.rect.height
-        
-        for path in paths:
-            for item in path["items"]:
-                cmd = item[0]
-                if cmd == "l":
-                    p1 = item[1]
-                    p2 = item[2]
-                    msp.add_line(
-                        self._transform_point(p1, 0, page_height),
-                        self._transform_point(p2, 0, page_height),
-                        dxfattribs={'layer': 'PDF_GEOMETRY'}
-                    )
-                elif cmd == "c":
-                    p1 = item[1]
-                    p2 = item[2]
-                    p3 = item[3]
-                    p4 = item[4]
-                    control_points = [
-                        self._transform_point(p1, 0, page_height),
-                        self._transform_point(p2, 0, page_height),
-                        self._transform_point(p3, 0, page_height),
-                        self._transform_point(p4, 0, page_height)
-                    ]
-                    msp.add_spline(control_points, degree=3, dxfattribs={'layer': 'PDF_GEOMETRY'})
-                elif cmd == "re":
-                    rect = item[1]
-                    p1 = (rect.x0, rect.y0)
-                    p2 = (rect.x1, rect.y0)
-                    p3 = (rect.x1, rect.y1)
-                    p4 = (rect.x0, rect.y1)
-                    points = [p1, p2, p3, p4, p1]
-                    dxf_points = [self._transform_point(p, 0, page_height) for p in points]
-                    msp.add_lwpolyline(dxf_points, dxfattribs={'layer': 'PDF_GEOMETRY'})
-
-        # 2. Extract Text
-        text_dict = page.get_text("dict")
-        text_count = 0
-        for block in text_dict.get("blocks", []):
-            if block["type"] == 0: # Text block
-                for line in block["lines"]:
-                    for span in line["spans"]:
-                        text = span["text"]
-                        if not text.strip():
-                            continue
-                        
-                        text_count += 1
-                        size = span["size"]
-                        origin = span["origin"]
-                        insert_point = self._transform_point(origin, 0, page_height)
-                        
-                        msp.add_mtext(
-                            text,
-                            dxfattribs={
-                                'char_height': size,
-                                'insert': insert_point,
-                                'attachment_point': 7, # BottomLeft
-                                'layer': 'PDF_TEXT'
-                            }
-                        )
-        
-        QgsMessageLog.logMessage(f"PDF2DXF: Found {text_count} text objects on page.", "PDF2DXF", Qgis.Info)
+    def _iter_pages(self, doc, jobs, ezdxf, in_memory, profile, is_canceled, binary=False, clip=None):
+        """Converts (page_num, path) jobs one by one, yields (page_num, path, text_count, bytes or None)."""
+        from . import conversion, profiling
+        for page_num, path in jobs:
+            conversion.check_canceled(is_canceled)
+            dxf = conversion.new_dxf(ezdxf)
+            text_count = 0
+            if page_num is not None:
+                text_count = conversion.convert_page(doc[page_num], dxf.modelspace(), profile, is_canceled, clip)
+            with profiling.stage(profile, page_num or 0, "save"):
+                data = conversion.save_dxf(dxf, None if in_memory else path, binary)
+            yield page_num, path, text_count, data
+
+    def _run_pool(self, pdf_path, jobs, workers, in_memory, profile, is_canceled, binary=False, clip=None):
+        """
+        Converts (page_num, path) jobs in worker processes and yields
+        (page_num, path, text_count, bytes or None) in page order.
+        Workers are spawned with the Python interpreter of the QGIS installation,
+        since sys.executable is QGIS itself.
+        """
+        from . import conversion
+        context = multiprocessing.get_context('spawn')
+        context.set_executable(dependencies.get_python_executable())
 
-    def _transform_point(self, point, x_offset, page_height):
-        x, y = point[0], point[1]
-        new_y = page_height - y
-        return (x + x_offset, new_y)
+        pending = deque()
+        remaining = iter(jobs)
+        pool = ProcessPoolExecutor(max_workers=min(workers, len(jobs)), mp_context=context)
+
+        def submit_next():
+            for page_num, path in remaining:
+                future = pool.submit(conversion.convert_page_job, pdf_path, page_num,
+                                     None if in_memory else path, profile is not None, binary, clip)
+                pending.append((page_num, path, future))
+                return
+
+        try:
+            for _ in range(2 * workers):
+                submit_next()
+            while pending:
+                conversion.check_canceled(is_canceled)
+                page_num, path, future = pending[0]
+                # Wait in short steps, so a cancel request is seen while pages are running
+                while not future.done():
+                    wait([future], timeout=0.2)
+                    conversion.check_canceled(is_canceled)
+                pending.popleft()
+                text_count, profile_pages, data = future.result()
+                if profile_pages:
+                    profile.merge(profile_pages)
+                submit_next()
+                yield page_num, path, text_count, data
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from qgis.core import QgsApplication
+from qgis.PyQt.QtCore import QTimer
 from .pdf_to_dxf_provider import PdfToDxfProvider
 
 class PdfToDxfPlugin:
@@ -12,7 +13,11 @@ class PdfToDxfPlugin:
         self.provider = PdfToDxfProvider()
         QgsApplication.processingRegistry().addProvider(self.provider)
         
-        # Check dependencies on startup
+        # Check dependencies once QGIS has finished starting: the check imports
+        # PyMuPDF and ezdxf, which would otherwise delay the start-up
+        QTimer.singleShot(0, self.check_dependencies)
+
+    def check_dependencies(self):
         from . import dependencies
         dependencies.install_deps(self.iface)
 
@@ -0,0 +1,165 @@
+"""
+Benchmarks PDF2DXFConverter on synthetic drawings.
+
+Usage:
+    python benchmarks/bench_convert.py --scale medium --output bench_results.json
+    python benchmarks/bench_convert.py --baseline benchmarks/baseline.json
+
+Each case records pages/sec, entities/sec, peak traced Python memory, peak RSS
+and output size. With --baseline, the run is compared against a stored result
+file and the script exits with status 1 if a case regressed.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import create_synthetic_pdf
+from src.converter import PDF2DXFConverter
+
+# Per-page content for each scale
+SCALES = {
+    'small': {'pages': 2, 'lines': 500, 'curves': 100, 'rects': 50, 'spans': 50},
+    'medium': {'pages': 5, 'lines': 5000, 'curves': 1000, 'rects': 500, 'spans': 500},
+    'large': {'pages': 10, 'lines': 50000, 'curves': 5000, 'rects': 2000, 'spans': 2000},
+}
+
+# Metrics where higher is better, compared against the baseline
+THROUGHPUT_METRICS = ('pages_per_sec', 'entities_per_sec')
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None if unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    if sys.platform == 'darwin':
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def run_case(pdf_path, out_dir, options, workers, repeat):
+    """Converts pdf_path `repeat` times and returns the metrics of the fastest run."""
+    best = None
+    for _ in range(repeat):
+        converter = PDF2DXFConverter(pdf_path, **options)
+        converter.verbose = False
+        start = time.perf_counter()
+        files = converter.convert(os.path.join(out_dir, 'out.dxf'), workers=workers)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best[0]:
+            best = (elapsed, converter, files)
+    elapsed, converter, files = best
+
+    # Separate run for memory, tracemalloc slows the conversion down
+    converter = PDF2DXFConverter(pdf_path, **options)
+    converter.verbose = False
+    tracemalloc.start()
+    converter.convert(os.path.join(out_dir, 'out.dxf'), workers=1)
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    pages = len(files)
+    entities = converter.stats['entities'] + converter.stats['texts']
+    return {
+        'seconds': round(elapsed, 4),
+        'pages': pages,
+        'entities': entities,
+        'pages_per_sec': round(pages / elapsed, 3),
+        'entities_per_sec': round(entities / elapsed, 1),
+        'peak_traced_mb': round(traced_peak / (1024 * 1024), 2),
+        'peak_rss_mb': peak_rss_mb(),
+        'output_bytes': sum(os.path.getsize(f) for f in files),
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    Compares results against a baseline results dict.
+    :return: List of regression messages, empty if none.
+    """
+    regressions = []
+    for name, case in results['cases'].items():
+        reference = baseline.get('cases', {}).get(name)
+        if reference is None:
+            continue
+        for metric in THROUGHPUT_METRICS:
+            if case[metric] < reference[metric] * (1 - threshold):
+                regressions.append(f"{name}: {metric} {case[metric]} < baseline {reference[metric]}")
+        if case['output_bytes'] > reference['output_bytes'] * (1 + threshold):
+            regressions.append(f"{name}: output_bytes {case['output_bytes']} > baseline {reference['output_bytes']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF to DXF conversion on synthetic drawings.")
+    parser.add_argument("--scale", choices=sorted(SCALES), action="append",
+                        help="Preset scale to run, can be repeated (default: small).")
+    parser.add_argument("--pages", type=int, help="Override pages per document.")
+    parser.add_argument("--lines", type=int, help="Override line segments per page.")
+    parser.add_argument("--curves", type=int, help="Override curves per page.")
+    parser.add_argument("--rects", type=int, help="Override rectangles per page.")
+    parser.add_argument("--spans", type=int, help="Override text spans per page.")
+    parser.add_argument("--backend", choices=["ezdxf", "stream"], default="ezdxf")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3, help="Timing runs per case, the fastest is kept.")
+    parser.add_argument("--output", default="bench_results.json", help="Where to save the results JSON.")
+    parser.add_argument("--baseline", help="Results JSON to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="Allowed relative slowdown before a case counts as a regression.")
+    args = parser.parse_args()
+
+    results = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'options': {'backend': args.backend, 'workers': args.workers},
+        'cases': {},
+    }
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for scale in args.scale or ['small']:
+            params = dict(SCALES[scale])
+            for key in params:
+                if getattr(args, key) is not None:
+                    params[key] = getattr(args, key)
+
+            pdf_path = create_synthetic_pdf(os.path.join(tmpdir, f"{scale}.pdf"), **params)
+            out_dir = os.path.join(tmpdir, scale)
+            os.makedirs(out_dir)
+
+            case = run_case(pdf_path, out_dir, {'backend': args.backend}, args.workers, args.repeat)
+            case['params'] = params
+            results['cases'][scale] = case
+            print(f"{scale}: {case['pages_per_sec']} pages/s, {case['entities_per_sec']} entities/s, "
+                  f"peak {case['peak_traced_mb']} MB traced, {case['output_bytes']} bytes")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Compares the two path extractors, page.get_drawings() and page.get_cdrawings().
+
+Usage:
+    python benchmarks/bench_extraction.py --lines 50000 --curves 5000
+    python benchmarks/bench_extraction.py --pdf plans.pdf --output extraction_results.json
+
+For each extractor it records the fastest time of --repeat runs over all pages,
+split into reading the paths and collecting their vertices (geometry.collect_items),
+and the peak traced Python memory of one pass. It also checks that both
+extractors give the same vertices.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import fitz
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import create_synthetic_pdf
+from src import geometry
+from src.converter import EXTRACTORS
+
+
+def extract(doc, extractor):
+    """Reads and collects the paths of every page, returns (read seconds, collect seconds, items)."""
+    read = collect = 0.0
+    pages = []
+    for page in doc:
+        start = time.perf_counter()
+        paths = geometry.get_paths(page, extractor)
+        read += time.perf_counter() - start
+        start = time.perf_counter()
+        pages.append(geometry.collect_items(paths))
+        collect += time.perf_counter() - start
+    return read, collect, pages
+
+
+def run_case(pdf_path, extractor, repeat):
+    best = None
+    with fitz.open(pdf_path) as doc:
+        for _ in range(repeat):
+            read, collect, pages = extract(doc, extractor)
+            if best is None or read + collect < best[0] + best[1]:
+                best = (read, collect, pages)
+
+        tracemalloc.start()
+        extract(doc, extractor)
+        _, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    read, collect, pages = best
+    return {
+        'read_seconds': round(read, 4),
+        'collect_seconds': round(collect, 4),
+        'seconds': round(read + collect, 4),
+        'items': sum(len(items) for items in pages),
+        'peak_traced_mb': round(traced_peak / (1024 * 1024), 2),
+    }, pages
+
+
+def same_items(pages, other):
+    return all(a.cmds == b.cmds and np.array_equal(a.points, b.points) for a, b in zip(pages, other))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare get_drawings() and get_cdrawings() extraction.")
+    parser.add_argument("--pdf", help="PDF to measure, instead of a synthetic drawing.")
+    parser.add_argument("--pages", type=int, default=3, help="Pages of the synthetic drawing.")
+    parser.add_argument("--lines", type=int, default=20000, help="Line segments per synthetic page.")
+    parser.add_argument("--curves", type=int, default=2000, help="Curves per synthetic page.")
+    parser.add_argument("--rects", type=int, default=1000, help="Rectangles per synthetic page.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing runs per extractor, the fastest is kept.")
+    parser.add_argument("--output", default="extraction_results.json", help="Where to save the results JSON.")
+    args = parser.parse_args()
+
+    results = {
+        'python': platform.python_version(),
+        'pymupdf': fitz.VersionBind,
+        'platform': platform.platform(),
+        'extractors': {},
+    }
+    with tempfile.TemporaryDirectory() as tmpdir:
+        pdf_path = args.pdf
+        if pdf_path is None:
+            pdf_path = create_synthetic_pdf(os.path.join(tmpdir, "extraction.pdf"), pages=args.pages,
+                                            lines=args.lines, curves=args.curves, rects=args.rects, spans=0)
+        results['pdf'] = args.pdf or "synthetic"
+
+        extracted = {}
+        for extractor in EXTRACTORS:
+            case, extracted[extractor] = run_case(pdf_path, extractor, args.repeat)
+            results['extractors'][extractor] = case
+            print(f"{extractor}: {case['seconds']:.3f}s (read {case['read_seconds']:.3f}s, "
+                  f"collect {case['collect_seconds']:.3f}s), {case['items']} items, "
+                  f"peak {case['peak_traced_mb']} MB traced")
+
+    results['identical'] = same_items(*extracted.values())
+    fast, reference = (results['extractors'][name]['seconds'] for name in EXTRACTORS)
+    print(f"Speed-up: {reference / fast:.2f}x, identical items: {results['identical']}")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to {args.output}")
+    if not results['identical']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
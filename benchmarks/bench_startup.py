@@ -0,0 +1,115 @@
+"""
+Measures start-up time of the CLI and the QGIS plugin modules.
+
+Usage:
+    python benchmarks/bench_startup.py --output startup_results.json
+    python benchmarks/bench_startup.py --baseline benchmarks/startup_baseline.json
+
+Each case runs in a fresh interpreter. It records the fastest wall time of
+--repeat runs and whether PyMuPDF or ezdxf were imported, which none of the
+start-up paths should do. With --baseline, the script exits with status 1
+if a case got slower than the threshold allows or started loading them.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI = os.path.join(ROOT, "src", "cli.py")
+
+# Modules that only a conversion should load
+HEAVY_MODULES = ("fitz", "pymupdf", "ezdxf")
+
+# name -> interpreter arguments
+CASES = {
+    'python': ["-c", "pass"],
+    'cli_help': [CLI, "--help"],
+    'cli_batch_help': [CLI, "batch", "--help"],
+    # Reference: what every conversion pays
+    'converter_import': ["-c", "import src.converter"],
+}
+if importlib.util.find_spec("qgis") is not None:
+    CASES['plugin_import'] = ["-c", "import PDFtoDXF.pdf_to_dxf_plugin, PDFtoDXF.pdf_to_dxf_algorithm"]
+
+
+def run_case(args, repeat):
+    """Returns the fastest wall time of args and the heavy modules it imported."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=ROOT, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    # -X importtime lists every imported module on stderr
+    result = subprocess.run([sys.executable, "-X", "importtime"] + args, cwd=ROOT, check=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    imported = set()
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            module = line.rsplit("|", 1)[1].strip()
+            if module.split(".")[0] in HEAVY_MODULES:
+                imported.add(module.split(".")[0])
+    return {'seconds': round(best, 4), 'heavy_imports': sorted(imported)}
+
+
+def compare(results, baseline, threshold):
+    """
+    Compares results against a baseline results dict.
+    :return: List of regression messages, empty if none.
+    """
+    regressions = []
+    for name, case in results['cases'].items():
+        reference = baseline.get('cases', {}).get(name)
+        if reference is None:
+            continue
+        if case['seconds'] > reference['seconds'] * (1 + threshold):
+            regressions.append(f"{name}: {case['seconds']}s > baseline {reference['seconds']}s")
+        if case['heavy_imports'] and not reference['heavy_imports']:
+            regressions.append(f"{name}: now imports {', '.join(case['heavy_imports'])}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure CLI and plugin start-up time.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per case, the fastest is kept.")
+    parser.add_argument("--output", default="startup_results.json", help="Where to save the results JSON.")
+    parser.add_argument("--baseline", help="Results JSON to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed relative slowdown before a case counts as a regression.")
+    args = parser.parse_args()
+
+    results = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cases': {},
+    }
+    for name, case_args in CASES.items():
+        case = run_case(case_args, args.repeat)
+        results['cases'][name] = case
+        heavy = ", ".join(case['heavy_imports']) or "none"
+        print(f"{name}: {case['seconds'] * 1000:.0f} ms, heavy imports: {heavy}")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
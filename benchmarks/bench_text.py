@@ -0,0 +1,134 @@
+"""
+Compares text extraction with PyMuPDF's default get_text("dict") flags and the
+lean flags the converter uses, which leave out images.
+
+Usage:
+    python benchmarks/bench_text.py --pages 3 --image-size 3000
+    python benchmarks/bench_text.py --pdf scanned_plans.pdf --output text_results.json
+
+For each mode it records the fastest time of --repeat passes over all pages,
+the peak traced Python memory of one pass and, since decoded images live in
+MuPDF's C heap, how far one pass in a fresh process raises the peak resident
+set size. It also checks that both modes give the same spans.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+import fitz
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import create_synthetic_pdf
+from src import profiling, text
+from src.converter import TEXT_FLAGS
+
+# name -> get_text("dict") flags
+MODES = {
+    'default': fitz.TEXTFLAGS_DICT,
+    'lean': TEXT_FLAGS,
+}
+
+
+def extract(doc, flags):
+    """get_text("dict") of every page, returns the collected spans per page."""
+    return [text.collect_spans(page.get_text("dict", flags=flags)) for page in doc]
+
+
+def _peak_rss_growth(pdf_path, flags):
+    """Runs in a fresh process: MB the peak RSS grows by during one pass, or None if unknown."""
+    with fitz.open(pdf_path) as doc:
+        before = profiling.resident_memory()
+        extract(doc, flags)
+    if resource is None or before is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    peak = peak if sys.platform == 'darwin' else peak * 1024
+    return round(max(peak - before, 0) / (1024 * 1024), 2)
+
+
+def run_case(pdf_path, flags, repeat):
+    with fitz.open(pdf_path) as doc:
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            spans = extract(doc, flags)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        # Peak over one pass, while each page's result is alive
+        tracemalloc.start()
+        extract(doc, flags)
+        _, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        rss_growth = pool.submit(_peak_rss_growth, pdf_path, flags).result()
+
+    return {
+        'seconds': round(best, 4),
+        'spans': sum(len(page_spans) for page_spans in spans),
+        'peak_traced_mb': round(traced_peak / (1024 * 1024), 2),
+        'peak_rss_growth_mb': rss_growth,
+    }, spans
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare default and lean text extraction.")
+    parser.add_argument("--pdf", help="PDF to measure, instead of a synthetic drawing.")
+    parser.add_argument("--pages", type=int, default=3, help="Pages of the synthetic drawing.")
+    parser.add_argument("--spans", type=int, default=500, help="Text spans per synthetic page.")
+    parser.add_argument("--image-size", type=int, default=2000,
+                        help="Width and height of the image under each synthetic page, in pixels.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing runs per mode, the fastest is kept.")
+    parser.add_argument("--output", default="text_results.json", help="Where to save the results JSON.")
+    args = parser.parse_args()
+
+    results = {
+        'python': platform.python_version(),
+        'pymupdf': fitz.VersionBind,
+        'platform': platform.platform(),
+        'modes': {},
+    }
+    with tempfile.TemporaryDirectory() as tmpdir:
+        pdf_path = args.pdf
+        if pdf_path is None:
+            pdf_path = create_synthetic_pdf(os.path.join(tmpdir, "text.pdf"), pages=args.pages, lines=0,
+                                            curves=0, rects=0, spans=args.spans, images=1,
+                                            image_size=args.image_size)
+        results['pdf'] = args.pdf or "synthetic"
+
+        extracted = {}
+        for name, flags in MODES.items():
+            case, extracted[name] = run_case(pdf_path, flags, args.repeat)
+            results['modes'][name] = case
+            print(f"{name}: {case['seconds']:.3f}s, {case['spans']} spans, "
+                  f"peak {case['peak_traced_mb']} MB traced, peak RSS +{case['peak_rss_growth_mb']} MB")
+
+    results['identical'] = extracted['default'] == extracted['lean']
+    default, lean = results['modes']['default'], results['modes']['lean']
+    print(f"Lean mode: {default['seconds'] / max(lean['seconds'], 1e-9):.1f}x faster, "
+          f"identical spans: {results['identical']}")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to {args.output}")
+    if not results['identical']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import random
+
+import fitz
+import numpy as np
+
+
+def create_synthetic_pdf(path, pages=1, lines=1000, curves=200, rects=100, spans=200,
+                         chain_length=10, seed=0, images=0, image_size=2000):
+    """
+    Creates a PDF with random vector content at a configurable scale.
+    :param path: Output PDF path.
+    :param pages: Number of pages.
+    :param lines: Line segments per page, drawn as polylines of chain_length segments.
+    :param curves: Circles per page (4 Bezier curves each) plus as many free Beziers.
+    :param rects: Rectangles per page.
+    :param spans: Text spans per page.
+    :param seed: Random seed, so the same arguments always give the same PDF.
+    :param images: Raster images per page, like a scanned basemap under the vectors.
+    :param image_size: Width and height of each image in pixels.
+    """
+    rng = random.Random(seed)
+    doc = fitz.open()
+    image = _test_image(image_size) if images else None
+    for _ in range(pages):
+        page = doc.new_page(width=1190, height=842) # A3 landscape
+        width, height = page.rect.width, page.rect.height
+
+        def point():
+            return fitz.Point(rng.uniform(0, width), rng.uniform(0, height))
+
+        for _ in range(images):
+            # The same image object is stored once and shown on every page
+            page.insert_image(page.rect, pixmap=image)
+
+        shape = page.new_shape()
+        remaining = lines
+        while remaining > 0:
+            count = min(chain_length, remaining)
+            start = point()
+            vertices = [start]
+            for _ in range(count):
+                last = vertices[-1]
+                vertices.append(last + (rng.uniform(-20, 20), rng.uniform(-20, 20)))
+            shape.draw_polyline(vertices)
+            shape.finish(width=0.3, closePath=False)
+            remaining -= count
+
+        for _ in range(curves // 2):
+            shape.draw_circle(point(), rng.uniform(1, 15))
+            shape.finish(width=0.3)
+        for _ in range(curves - curves // 2):
+            shape.draw_bezier(point(), point(), point(), point())
+            shape.finish(width=0.3, closePath=False)
+
+        for _ in range(rects):
+            p = point()
+            shape.draw_rect(fitz.Rect(p, p + (rng.uniform(2, 60), rng.uniform(2, 40))))
+            shape.finish(width=0.3)
+        shape.commit()
+
+        for i in range(spans):
+            page.insert_text(point(), f"PT{i} {rng.uniform(0, 999):.2f}", fontsize=rng.choice((6, 8, 10)))
+
+    doc.save(path)
+    doc.close()
+    return path
+
+
+def _test_image(size):
+    """RGB pixmap with a pattern, compact in the PDF but full size once decoded."""
+    y, x = np.mgrid[0:size, 0:size]
+    pixels = np.stack(((x ^ y) & 255, (x * 3) & 255, (y * 5) & 255), axis=-1).astype(np.uint8)
+    return fitz.Pixmap(fitz.csRGB, size, size, pixels.tobytes(), False)
@@ -0,0 +1,67 @@
+import io
+import os
+import tarfile
+import time
+import zipfile
+
+ARCHIVE_FORMATS = ("zip", "tar")
+
+
+def archive_extension(fmt, compression_level=6):
+    """File extension of an archive: .zip, .tar.gz or, uncompressed, .tar."""
+    if fmt == "zip":
+        return ".zip"
+    return ".tar.gz" if compression_level > 0 else ".tar"
+
+
+def archive_path(output_path, fmt, compression_level=6):
+    """Returns output_path with the archive extension, unless it already has it."""
+    ext = archive_extension(fmt, compression_level)
+    if output_path.lower().endswith(ext):
+        return output_path
+    return os.path.splitext(output_path)[0] + ext
+
+
+class ArchiveWriter:
+    """
+    Writes DXF files into a ZIP or gzipped tar archive one at a time,
+    so only the member being added has to be held in memory.
+    """
+
+    def __init__(self, path, fmt="zip", compression_level=6):
+        """
+        :param path: Archive file path or writable binary file object.
+        :param fmt: "zip" or "tar" (gzip compressed).
+        :param compression_level: 0 (store) to 9 (smallest).
+        """
+        if fmt not in ARCHIVE_FORMATS:
+            raise ValueError(f"Unknown archive format '{fmt}', expected one of {', '.join(ARCHIVE_FORMATS)}.")
+        self.fmt = fmt
+        if fmt == "zip":
+            compression = zipfile.ZIP_DEFLATED if compression_level > 0 else zipfile.ZIP_STORED
+            self._archive = zipfile.ZipFile(path, "w", compression, compresslevel=compression_level or None)
+        else:
+            target = {"name": path} if isinstance(path, (str, os.PathLike)) else {"fileobj": path}
+            if compression_level > 0:
+                self._archive = tarfile.open(mode="w:gz", compresslevel=compression_level, **target)
+            else:
+                self._archive = tarfile.open(mode="w", **target)
+
+    def add(self, name, data):
+        """Adds a member with the given bytes."""
+        if self.fmt == "zip":
+            self._archive.writestr(name, data)
+        else:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            self._archive.addfile(info, io.BytesIO(data))
+
+    def close(self):
+        self._archive.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,359 @@
+import csv
+import glob
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import fitz  # PyMuPDF
+
+# incremental is also a BatchConverter parameter, hence the alias
+try:
+    from . import cache, converter
+    from . import incremental as incremental_io
+except ImportError:
+    import cache
+    import converter
+    import incremental as incremental_io
+
+# Columns of the CSV manifest, one row per page
+MANIFEST_FIELDS = ("pdf", "page", "output", "status", "seconds", "entities", "texts", "error")
+
+# Seconds between manifest rewrites while a batch is running
+FLUSH_INTERVAL = 5.0
+
+
+def find_pdfs(inputs):
+    """
+    Expands directories (searched recursively), glob patterns and file paths
+    into a sorted list of (pdf_path, root) tuples without duplicates.
+    root is the directory the output layout is mirrored from.
+    """
+    found = {}
+    for item in inputs:
+        if os.path.isdir(item):
+            for dirpath, _, files in os.walk(item):
+                for name in files:
+                    if name.lower().endswith(".pdf"):
+                        found.setdefault(os.path.join(dirpath, name), item)
+        elif glob.has_magic(item):
+            root = os.path.dirname(item.split("*")[0].split("?")[0].split("[")[0])
+            for path in glob.glob(item, recursive=True):
+                if os.path.isfile(path):
+                    found.setdefault(path, root)
+        else:
+            found.setdefault(item, os.path.dirname(item))
+    return sorted(found.items())
+
+
+def output_base(pdf_path, root, output_dir):
+    """DXF path for pdf_path, mirroring its location below root inside output_dir."""
+    relative = os.path.relpath(pdf_path, root) if root else os.path.basename(pdf_path)
+    if relative.startswith(os.pardir):
+        relative = os.path.basename(pdf_path)
+    return os.path.join(output_dir, os.path.splitext(relative)[0] + ".dxf")
+
+
+def options_path(path):
+    """Sidecar of a CSV manifest that stores the converter version and options: run.csv -> run.options.json"""
+    return os.path.splitext(path)[0] + ".options.json"
+
+
+def load_manifest(path):
+    """
+    Reads a JSON or CSV manifest.
+    :return: ({(pdf, page): record}, options), both empty when the file does not
+             exist or was written by another converter version. options is None
+             if the manifest does not record them.
+    """
+    if not os.path.exists(path):
+        return {}, None
+    records = {}
+    if path.lower().endswith(".csv"):
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                row['page'] = int(row['page']) if row['page'] else None
+                row['seconds'] = float(row['seconds'] or 0)
+                row['entities'] = int(row['entities'] or 0)
+                row['texts'] = int(row['texts'] or 0)
+                records[(row['pdf'], row['page'])] = row
+        try:
+            with open(options_path(path)) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return records, None
+    else:
+        with open(path) as f:
+            manifest = json.load(f)
+    for pdf_path, entry in manifest.get('files', {}).items():
+        if not entry['pages']:
+            records[(pdf_path, None)] = _record(pdf_path, None, None, entry['status'], error=entry['error'])
+        for page, record in entry['pages'].items():
+            records[(pdf_path, int(page))] = dict(record, pdf=pdf_path, page=int(page))
+    if manifest.get('version') != cache.CONVERTER_VERSION:
+        # Written by another converter version, nothing can be reused
+        return {}, None
+    return records, manifest.get('options')
+
+
+def write_manifest(path, records, options):
+    """
+    Atomically writes the records as CSV (one row per page) or JSON
+    (per-file status, timings and counts with the pages nested). A CSV manifest
+    gets its options in a sidecar JSON, see options_path().
+    """
+    ordered = sorted(records.values(), key=lambda r: (r['pdf'], -1 if r['page'] is None else r['page']))
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", newline="") as f:
+            if path.lower().endswith(".csv"):
+                writer = csv.DictWriter(f, fieldnames=MANIFEST_FIELDS)
+                writer.writeheader()
+                for record in ordered:
+                    writer.writerow({key: record[key] for key in MANIFEST_FIELDS})
+            else:
+                json.dump({'version': cache.CONVERTER_VERSION, 'options': options,
+                           'files': _group_by_file(ordered)}, f, indent=2)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if path.lower().endswith(".csv"):
+        write_manifest(options_path(path), {}, options)
+
+
+def _group_by_file(records):
+    files = {}
+    for record in records:
+        entry = files.setdefault(record['pdf'], {'status': "ok", 'seconds': 0.0, 'entities': 0,
+                                                 'texts': 0, 'error': None, 'pages': {}})
+        if record['status'] == "error":
+            entry['status'] = "error"
+            entry['error'] = entry['error'] or record['error']
+        if record['page'] is None:
+            continue
+        entry['seconds'] = round(entry['seconds'] + record['seconds'], 4)
+        entry['entities'] += record['entities']
+        entry['texts'] += record['texts']
+        entry['pages'][str(record['page'])] = {key: record[key] for key in MANIFEST_FIELDS
+                                               if key not in ('pdf', 'page')}
+    return files
+
+
+def _record(pdf_path, page_num, output, status, seconds=0.0, stats=None, error=None):
+    return {'pdf': pdf_path, 'page': page_num, 'output': output, 'status': status,
+            'seconds': round(seconds, 4), 'entities': stats['entities'] if stats else 0,
+            'texts': stats['texts'] if stats else 0, 'error': error}
+
+
+def _batch_page_job(pdf_path, kwargs, page_num, output_path):
+    """
+    Pool entry point: converts one page and returns (stats, seconds, error).
+    Errors are returned as text so one broken page does not stop the batch.
+    """
+    start = time.perf_counter()
+    try:
+        stats, _, _ = converter._convert_page_job(pdf_path, kwargs, page_num, output_path)
+    except Exception as e:
+        return None, time.perf_counter() - start, f"{type(e).__name__}: {e}"
+    return stats, time.perf_counter() - start, None
+
+
+class BatchConverter:
+    """
+    Converts many PDFs in one process pool, so workers pay the interpreter,
+    fitz and ezdxf start-up cost once instead of once per document.
+    Pages of all documents are scheduled as individual jobs; each result is
+    recorded in a manifest, which also lets an interrupted run resume.
+    """
+
+    def __init__(self, output_dir, workers=1, manifest_path=None, resume=False, incremental=False,
+                 **converter_kwargs):
+        """
+        :param output_dir: Directory for the DXF files, mirroring the input layout.
+        :param workers: Number of worker processes, 0 or None for one per CPU.
+        :param manifest_path: JSON or CSV manifest, default output_dir/manifest.json.
+        :param resume: Skip pages the existing manifest lists as converted, if their DXF still exists.
+        :param incremental: Skip pages whose DXF is current according to the sidecar
+                        state file of each document, see incremental.py.
+        Other keyword arguments are passed to each PDF2DXFConverter.
+        """
+        self.output_dir = output_dir
+        if workers is None or workers < 1:
+            workers = os.cpu_count() or 1
+        self.workers = workers
+        self.manifest_path = manifest_path or os.path.join(output_dir, "manifest.json")
+        self.resume = resume
+        self.incremental = incremental
+        self.converter_kwargs = converter_kwargs
+        self.records = {}
+        self.options = None
+        # pdf_path -> (ConversionState, {page_num: fingerprint}) in incremental mode,
+        # the fingerprints of the pages still to convert
+        self._states = {}
+        # States with pages recorded since they were last saved
+        self._unsaved = set()
+        # Outcome -> pages of the current run: "ok", "error", "current" and "resumed"
+        self._counts = {}
+        self.verbose = True
+
+    def _plan(self, inputs):
+        """Yields (pdf_path, page_num, output_path) for every page still to convert."""
+        for pdf_path, root in find_pdfs(inputs):
+            base = output_base(pdf_path, root, self.output_dir)
+            stem, ext = os.path.splitext(base)
+            try:
+                with fitz.open(pdf_path) as doc:
+                    jobs = []
+                    for page_num in range(len(doc)):
+                        # Same naming as PDF2DXFConverter.convert
+                        output = f"{stem}_page_{page_num + 1}{ext}" if len(doc) > 1 else base
+                        done = self.records.get((pdf_path, page_num))
+                        if done and done['status'] in ("ok", "current") and os.path.exists(done['output']):
+                            self._count("resumed")
+                            continue
+                        jobs.append((pdf_path, page_num, output))
+                    if self.incremental:
+                        jobs = self._stale_jobs(doc, pdf_path, base, jobs)
+            except Exception as e:
+                self.records[(pdf_path, None)] = _record(pdf_path, None, None, "error",
+                                                         error=f"{type(e).__name__}: {e}")
+                self._count("error")
+                if self.verbose:
+                    print(f"Error: could not open {pdf_path}: {e}")
+                continue
+            self.records.pop((pdf_path, None), None)
+
+            for job in jobs:
+                os.makedirs(os.path.dirname(job[2]) or ".", exist_ok=True)
+                yield job
+
+    def _stale_jobs(self, doc, pdf_path, base, jobs):
+        """Drops the jobs whose output is current and fingerprints the remaining pages."""
+        state = incremental_io.ConversionState(incremental_io.state_path(base), pdf_path, self.options)
+        stale = []
+        for job in jobs:
+            if state.is_current(doc, job[1], job[2]):
+                self.records[(pdf_path, job[1])] = _record(pdf_path, job[1], job[2], "current")
+                self._count("current")
+            else:
+                stale.append(job)
+        if stale:
+            self._states[pdf_path] = (state, {page_num: cache.page_fingerprint(doc, doc[page_num])
+                                              for _, page_num, _ in stale})
+        elif state.source_changed:
+            # e.g. touched or copied, store the new mtime so the next run skips hashing
+            state.save()
+        return stale
+
+    def _count(self, outcome):
+        self._counts[outcome] = self._counts.get(outcome, 0) + 1
+
+    def run(self, inputs):
+        """
+        Converts every PDF found in inputs (directories, glob patterns or files).
+        :return: The manifest records, {(pdf, page): record}.
+        """
+        kwargs = dict(self.converter_kwargs)
+        # The options that affect the output, as used by the page cache key
+        options = converter.PDF2DXFConverter(None, **kwargs)._page_options()
+        self.options = options
+        self._states = {}
+        self._unsaved = set()
+        self._counts = {}
+
+        self.records = {}
+        if self.resume:
+            self.records, previous_options = load_manifest(self.manifest_path)
+            if self.records and previous_options != options:
+                if self.verbose:
+                    if previous_options is None:
+                        print("The manifest does not record its conversion options, converting all pages again.")
+                    else:
+                        print("Conversion options changed since the manifest was written, converting all pages again.")
+                self.records = {}
+        last_flush = time.monotonic()
+
+        try:
+            for pdf_path, page_num, output, result in self._results(self._plan(inputs), kwargs):
+                stats, seconds, error = result
+                status = "ok" if error is None else "error"
+                self._count(status)
+                self.records[(pdf_path, page_num)] = _record(pdf_path, page_num, output, status,
+                                                             seconds, stats, error)
+                if pdf_path in self._states:
+                    self._record_state(pdf_path, page_num, output, error)
+                if self.verbose:
+                    if error:
+                        print(f"Error: {pdf_path} page {page_num + 1}: {error}")
+                    else:
+                        print(f"Saved page {page_num + 1} of {pdf_path} to {output} ({seconds:.2f}s)")
+                if time.monotonic() - last_flush > FLUSH_INTERVAL:
+                    write_manifest(self.manifest_path, self.records, options)
+                    self._save_states()
+                    last_flush = time.monotonic()
+        finally:
+            write_manifest(self.manifest_path, self.records, options)
+            self._save_states()
+            if kwargs.get('cache_dir'):
+                # Workers only store pages, the cap is enforced once for the whole batch
+                cache.PageCache(kwargs['cache_dir'], kwargs.get('cache_size', cache.DEFAULT_CACHE_SIZE)).evict()
+
+        if self.verbose:
+            counts = self._counts
+            resumed = f", {counts['resumed']} done in an earlier run" if counts.get('resumed') else ""
+            print(f"Batch: {counts.get('ok', 0)} page(s) converted, {counts.get('current', 0)} up to date, "
+                  f"{counts.get('error', 0)} failed{resumed}. Manifest saved to {self.manifest_path}")
+        return self.records
+
+    def _record_state(self, pdf_path, page_num, output, error):
+        """
+        Records a finished page in the incremental state of its PDF. The state
+        file is written once the PDF is done, and on each manifest flush.
+        """
+        state, fingerprints = self._states[pdf_path]
+        fingerprint = fingerprints.pop(page_num)
+        if error is None:
+            state.record(page_num, output, fingerprint)
+            self._unsaved.add(pdf_path)
+        if not fingerprints and pdf_path in self._unsaved:
+            state.save()
+            self._unsaved.discard(pdf_path)
+
+    def _save_states(self):
+        for pdf_path in sorted(self._unsaved):
+            self._states[pdf_path][0].save()
+        self._unsaved.clear()
+
+    def _results(self, jobs, kwargs):
+        """
+        Yields (pdf_path, page_num, output, (stats, seconds, error)) as pages finish.
+        At most 2 * workers jobs are queued, so planning stays lazy for huge batches.
+        """
+        if self.workers == 1:
+            for pdf_path, page_num, output in jobs:
+                yield pdf_path, page_num, output, _batch_page_job(pdf_path, kwargs, page_num, output)
+            return
+
+        pending = {}
+        # Spawned like the converter's pool: planning opens PDFs in this process
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context) as pool:
+            try:
+                for job in jobs:
+                    pending[pool.submit(_batch_page_job, job[0], kwargs, job[1], job[2])] = job
+                    if len(pending) < 2 * self.workers:
+                        continue
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield (*pending.pop(future), future.result())
+                for future in list(pending):
+                    yield (*pending.pop(future), future.result())
+            finally:
+                # Stop at once on errors and interrupts, unfinished pages are redone on resume
+                pool.shutdown(wait=False, cancel_futures=True)
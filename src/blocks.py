@@ -0,0 +1,170 @@
+import hashlib
+import math
+
+import numpy as np
+
+try:
+    from .geometry import PageItems
+except ImportError:
+    from geometry import PageItems
+
+# Coordinates are compared rounded to this many decimals (PDF points)
+FINGERPRINT_DECIMALS = 2
+
+# Decimals of symbol shapes normalized to unit size, when rotation and scale are ignored
+NORMALIZED_DECIMALS = 3
+
+# Paths with fewer items, or fewer entities once converted, are not turned into
+# symbols: an INSERT is about as large as a LINE or CIRCLE
+MIN_SYMBOL_ITEMS = 2
+MIN_SYMBOL_ENTITIES = 2
+
+# Occurrences on a page needed before a path becomes a symbol block
+MIN_SYMBOL_COUNT = 2
+
+
+def path_ranges(items):
+    """
+    Yields (item_start, item_end, point_start, point_end) for each path of
+    PageItems, whose items are contiguous as built by geometry.collect_items.
+    """
+    item_start = point_start = point = 0
+    path_ids = items.path_ids
+    for index, count in enumerate(items.counts):
+        if index and path_ids[index] != path_ids[index - 1]:
+            yield item_start, index, point_start, point
+            item_start, point_start = index, point
+        point += count
+    if len(items):
+        yield item_start, len(items), point_start, point
+
+
+def fingerprint(items, path_range, origin=None):
+    """
+    Hash of the commands and rounded vertices of one path of PageItems.
+    :param path_range: Tuple as yielded by path_ranges().
+    :param origin: Optional point subtracted first, which makes the hash translation invariant.
+    """
+    item_start, item_end, point_start, point_end = path_range
+    points = items.points[point_start:point_end]
+    if origin is not None:
+        points = points - origin
+    return _digest(items.cmds[item_start:item_end], points, FINGERPRINT_DECIMALS)
+
+
+def _digest(cmds, points, decimals):
+    # + 0.0 turns -0.0 into 0.0, which has different bytes
+    rounded = np.round(points, decimals) + 0.0
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update("".join(cmds).encode())
+    digest.update(rounded.tobytes())
+    return digest.digest()
+
+
+def path_items(items, path_range):
+    """PageItems with a copy of one path of items."""
+    item_start, item_end, point_start, point_end = path_range
+    return PageItems(items.cmds[item_start:item_end], items.path_ids[item_start:item_end],
+                     items.counts[item_start:item_end], items.points[point_start:point_end].copy())
+
+
+def find_symbols(items, rotation=False, min_items=MIN_SYMBOL_ITEMS):
+    """
+    Groups the paths of items that are copies of each other, moved and, with
+    rotation, also rotated and uniformly scaled.
+    Each path is placed at its first vertex. For rotation it is also turned and
+    scaled so that its farthest vertex from there lies at (1, 0) before hashing.
+    :param min_items: Paths with fewer drawing items are left out.
+    :return: {fingerprint: [(path_range, origin, angle, scale)]} in drawing order,
+             angle in radians. Without rotation, angle is 0.0 and scale 1.0.
+    """
+    groups = {}
+    for path_range in path_ranges(items):
+        item_start, item_end, point_start, point_end = path_range
+        if item_end - item_start < min_items:
+            continue
+        cmds = items.cmds[item_start:item_end]
+        points = items.points[point_start:point_end]
+        origin = points[0]
+        offsets = points - origin
+        angle, scale = 0.0, 1.0
+        fp = None
+        if rotation:
+            lengths = np.hypot(offsets[:, 0], offsets[:, 1])
+            # The first of (nearly) equally far vertices, so rounding noise picks the same one
+            far = int(np.argmax(lengths >= lengths.max() * (1 - 1e-6)))
+            if lengths[far] > 0:
+                angle = math.atan2(offsets[far, 1], offsets[far, 0])
+                scale = float(lengths[far])
+                cos, sin = math.cos(-angle) / scale, math.sin(-angle) / scale
+                normalized = offsets @ np.array([[cos, sin], [-sin, cos]])
+                fp = _digest(cmds, normalized, NORMALIZED_DECIMALS)
+        if fp is None:
+            fp = _digest(cmds, offsets, FINGERPRINT_DECIMALS)
+        groups.setdefault(fp, []).append((path_range, origin, angle, scale))
+    return groups
+
+
+class SharedContent:
+    """
+    Finds the paths that recur at the same position on several pages, such as
+    title blocks, borders and legends of a drawing set.
+
+    Paths are grouped by the set of pages they appear on, so each group (e.g.
+    "the frame shared by every page") becomes one block, defined from the
+    first page of the group and inserted on the others.
+    """
+
+    def __init__(self, page_items, min_pages=2):
+        """
+        :param page_items: {page_num: PageItems} in page coordinates (no page offset).
+        :param min_pages: Pages a path has to appear on to be shared.
+        """
+        # page_num -> [(key, path_range)], key is (fingerprint, occurrence on the page)
+        page_paths = {}
+        pages_of = {}
+        for page_num, items in page_items.items():
+            seen = {}
+            paths = []
+            for path_range in path_ranges(items):
+                fp = fingerprint(items, path_range)
+                key = (fp, seen.get(fp, 0))
+                seen[fp] = key[1] + 1
+                paths.append((key, path_range))
+                pages_of.setdefault(key, []).append(page_num)
+            page_paths[page_num] = paths
+
+        # Page set -> block name, numbered in order of first appearance
+        names = {}
+        # Block name -> (page_num it is taken from, PageItems)
+        self.blocks = {}
+        self._page_blocks = {}
+        self._shared_masks = {}
+        for page_num, paths in page_paths.items():
+            items = page_items[page_num]
+            mask = np.zeros(len(items), dtype=bool)
+            block_masks = {}
+            page_blocks = []
+            for key, (item_start, item_end, _, _) in paths:
+                pages = tuple(pages_of[key])
+                if len(pages) < min_pages:
+                    continue
+                mask[item_start:item_end] = True
+                name = names.setdefault(pages, f"SHARED_{len(names) + 1}")
+                if name not in page_blocks:
+                    page_blocks.append(name)
+                if pages[0] == page_num:
+                    block_mask = block_masks.setdefault(name, np.zeros(len(items), dtype=bool))
+                    block_mask[item_start:item_end] = True
+            for name, block_mask in block_masks.items():
+                self.blocks[name] = (page_num, items.subset(block_mask))
+            self._shared_masks[page_num] = mask
+            self._page_blocks[page_num] = page_blocks
+
+    def page_blocks(self, page_num):
+        """Names of the blocks to insert on page page_num."""
+        return self._page_blocks[page_num]
+
+    def own_items(self, page_num, items):
+        """The items of page page_num that are not part of a block."""
+        return items.subset(~self._shared_masks[page_num])
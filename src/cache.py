@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+# Bump when a change to the converter alters the DXF produced for the same input,
+# so that cached pages from older versions are not reused.
+CONVERTER_VERSION = "1"
+
+DEFAULT_CACHE_SIZE = 512 * 1024 * 1024 # 512 MB
+
+
+def page_fingerprint(doc, page):
+    """
+    Hashes everything that determines a page's drawings and text: its boxes and
+    rotation, its content stream and its resources (fonts, images and form
+    XObjects, including the XObject streams).
+    """
+    digest = hashlib.sha256()
+    digest.update(repr((tuple(page.mediabox), tuple(page.cropbox), page.rotation)).encode())
+    digest.update(page.read_contents())
+
+    kind, value = doc.xref_get_key(page.xref, "Resources")
+    if kind == "xref":
+        digest.update(doc.xref_object(int(value.split()[0]), compressed=True).encode())
+    else:
+        digest.update(value.encode())
+
+    xrefs = set()
+    xrefs.update(item[0] for item in page.get_fonts(full=True))
+    xrefs.update(item[0] for item in page.get_images(full=True))
+    xrefs.update(item[0] for item in page.get_xobjects())
+    for xref in sorted(x for x in xrefs if x > 0):
+        digest.update(doc.xref_object(xref, compressed=True).encode())
+        if doc.xref_is_stream(xref) and doc.xref_get_key(xref, "Subtype")[1] == "/Form":
+            digest.update(doc.xref_stream_raw(xref))
+    return digest.hexdigest()
+
+
+def cache_key(fingerprint, options):
+    """Combines a page fingerprint with the conversion options and converter version."""
+    payload = json.dumps({'page': fingerprint, 'options': options, 'version': CONVERTER_VERSION},
+                         sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class PageCache:
+    """
+    On-disk cache of converted page DXFs keyed by content hash.
+    Entries are plain files; their modification time tracks the last use,
+    and evict() removes the least recently used ones once the cache exceeds
+    max_bytes. It walks the whole directory, so callers run it once per
+    conversion rather than after every stored page.
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_CACHE_SIZE):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".dxf")
+
+    def fetch(self, key, output_path):
+        """
+        Copies the cached DXF for key to output_path, a file path or binary buffer.
+        Returns False on a miss.
+        """
+        path = self._path(key)
+        try:
+            if isinstance(output_path, (str, os.PathLike)):
+                shutil.copyfile(path, output_path)
+            else:
+                with open(path, "rb") as f:
+                    output_path.write(f.read())
+            os.utime(path) # Mark as recently used
+        except FileNotFoundError:
+            self.misses += 1
+            return False
+        self.hits += 1
+        return True
+
+    def store(self, key, dxf_path):
+        """
+        Adds a converted DXF, given as a file path or io.BytesIO, to the cache.
+        """
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Copy then rename, so concurrent readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        os.close(fd)
+        try:
+            if isinstance(dxf_path, (str, os.PathLike)):
+                shutil.copyfile(dxf_path, tmp_path)
+            else:
+                with open(tmp_path, "wb") as f:
+                    f.write(dxf_path.getvalue())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def evict(self):
+        """Removes least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(".dxf"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
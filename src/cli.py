@@ -1,17 +1,148 @@
 import argparse
+import json
 import sys
 import os
 
 # Add current directory to path so we can import converter if running directly
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.converter import PDF2DXFConverter
+from src import profiling
+
+def clip_region(value):
+    """argparse type of --clip: "cropbox" or an "x0,y0,x1,y1" box."""
+    if value == "cropbox":
+        return value
+    try:
+        box = [float(v) for v in value.split(",")]
+    except ValueError:
+        box = []
+    if len(box) != 4:
+        raise argparse.ArgumentTypeError(f"expected 'cropbox' or x0,y0,x1,y1, got '{value}'")
+    return box
+
+def positive_float(value):
+    """argparse type of the tolerances: a distance greater than 0."""
+    try:
+        number = float(value)
+    except ValueError:
+        number = 0.0
+    if not number > 0:
+        raise argparse.ArgumentTypeError(f"expected a positive number, got '{value}'")
+    return number
+
+def add_conversion_arguments(parser):
+    """Options shared by single and batch conversion."""
+    parser.add_argument("--backend", choices=["ezdxf", "stream"], default="ezdxf",
+                        help="DXF writer: 'ezdxf' document model or 'stream' for constant memory on dense pages.")
+    parser.add_argument("--chain", type=positive_float, nargs="?", const=0.01, default=None, metavar="TOLERANCE",
+                        help="Join connected line segments into polylines (default tolerance 0.01 pt).")
+    parser.add_argument("--dedup", type=positive_float, nargs="?", const=0.01, default=None, metavar="TOLERANCE",
+                        help="Drop repeated and overlapping geometry (default tolerance 0.01 pt).")
+    parser.add_argument("--arcs", type=positive_float, nargs="?", const=0.01, default=None, metavar="TOLERANCE",
+                        help="Write Bezier circles and arcs as CIRCLE/ARC entities (default tolerance 0.01 pt).")
+    parser.add_argument("--merge-text", action="store_true",
+                        help="Merge adjacent text spans of a line that share font and size.")
+    parser.add_argument("--text-entity", choices=["mtext", "text"], default="mtext",
+                        help="Write text as MTEXT (default) or lighter single-line TEXT entities.")
+    parser.add_argument("--format", choices=["ascii", "binary"], default="ascii",
+                        help="DXF encoding: 'binary' gives smaller files that write and load faster.")
+    parser.add_argument("--extractor", choices=["cdrawings", "drawings"], default="cdrawings",
+                        help="Path extraction: 'cdrawings' (default, faster) or PyMuPDF's get_drawings().")
+    parser.add_argument("--clip", type=clip_region, metavar="cropbox|x0,y0,x1,y1",
+                        help="Only convert paths and text inside the page's CropBox or a box in PDF points "
+                             "from the top-left corner of the page.")
+    parser.add_argument("--symbols", action="store_true",
+                        help="Write paths repeated on a page (valves, poles, trees) as one BLOCK with INSERTs.")
+    parser.add_argument("--symbols-rotated", action="store_true",
+                        help="Like --symbols, also matching rotated and scaled copies.")
+    parser.add_argument("--cache", metavar="DIR",
+                        help="Page cache directory: unchanged pages reuse their previously converted DXF.")
+    parser.add_argument("--cache-size", type=int, default=512, metavar="MB",
+                        help="Size cap of the page cache in MB (default 512).")
+    parser.add_argument("--low-memory", action="store_true",
+                        help="Convert one page at a time and regularly free cached PDF objects.")
+    parser.add_argument("--memory-limit", type=int, metavar="MB",
+                        help="Stop with an error if memory use (per process) stays above MB; implies --low-memory.")
+
+def converter_kwargs(args):
+    """PDF2DXFConverter keyword arguments from the shared options."""
+    return {
+        'backend': args.backend,
+        'chain_tolerance': args.chain,
+        'dedup_tolerance': args.dedup,
+        'arc_tolerance': args.arcs,
+        'merge_text': args.merge_text,
+        'text_entity': args.text_entity,
+        'dxf_format': args.format,
+        'symbol_blocks': args.symbols,
+        'symbol_rotation': args.symbols_rotated,
+        'clip': args.clip,
+        'extractor': args.extractor,
+        'cache_dir': args.cache,
+        'cache_size': args.cache_size * 1024 * 1024,
+        'low_memory': args.low_memory,
+        'memory_limit': args.memory_limit * 1024 * 1024 if args.memory_limit else None,
+    }
+
+def batch_main(argv):
+    parser = argparse.ArgumentParser(prog="cli.py batch", fromfile_prefix_chars="@",
+                                     description="Convert many PDFs to DXF in one worker pool. "
+                                                 "@FILE reads further inputs from FILE, one per line.")
+    parser.add_argument("inputs", nargs="+", help="PDF files, directories (searched recursively) or glob patterns.")
+    parser.add_argument("-o", "--output-dir", required=True,
+                        help="Directory for the DXF files, mirroring the input layout.")
+    parser.add_argument("--jobs", type=int, default=0, help="Number of worker processes (default 0 = one per CPU).")
+    parser.add_argument("--manifest", metavar="FILE",
+                        help="JSON or CSV (by extension) manifest of every page, default OUTPUT_DIR/manifest.json.")
+    parser.add_argument("--resume", action="store_true",
+                        help="Skip pages that the manifest lists as converted and whose DXF still exists.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only convert pages whose output is missing or out of date (state kept next to each output).")
+    add_conversion_arguments(parser)
+    args = parser.parse_args(argv)
+
+    # Imported after parsing, so --help does not load PyMuPDF and ezdxf
+    from src.batch import BatchConverter
+    try:
+        batch = BatchConverter(args.output_dir, workers=args.jobs, manifest_path=args.manifest,
+                               resume=args.resume, incremental=args.incremental, **converter_kwargs(args))
+        records = batch.run(args.inputs)
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if any(record['status'] == "error" for record in records.values()):
+        sys.exit(1)
 
 def main():
-    parser = argparse.ArgumentParser(description="Convert PDF to DXF.")
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        batch_main(sys.argv[2:])
+        return
+
+    parser = argparse.ArgumentParser(description="Convert PDF to DXF. Use 'cli.py batch -h' for batch conversion.")
     parser.add_argument("input_pdf", help="Path to the input PDF file.")
     parser.add_argument("output_dxf", help="Path to the output DXF file.")
     parser.add_argument("--pages", help="Comma-separated list of page numbers to convert (0-indexed).", default=None)
+    add_conversion_arguments(parser)
+    parser.add_argument("--jobs", type=int, default=1, help="Number of worker processes for multi-page conversion (0 = one per CPU).")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only convert pages whose output is missing or out of date (state kept in OUTPUT.pdf2dxf.json).")
+    parser.add_argument("--archive", choices=["zip", "tar"],
+                        help="Stream all pages into one ZIP or .tar.gz archive instead of separate files.")
+    parser.add_argument("--compression-level", type=int, default=6, choices=range(10), metavar="0-9",
+                        help="Archive compression level (default 6).")
+    parser.add_argument("--images", action="store_true",
+                        help="Extract embedded images to OUTPUT_images/ and place them as IMAGE entities.")
+    parser.add_argument("--single-file", action="store_true",
+                        help="Write all pages side by side into OUTPUT instead of one file per page.")
+    parser.add_argument("--shared-blocks", action="store_true",
+                        help="Write content repeated on several pages (title block, border) once as a "
+                             "BLOCK inserted on each page. Implies --single-file, ezdxf backend only.")
+    parser.add_argument("--profile", action="store_true",
+                        help="Print per-stage timings (get_drawings, get_text, entity creation, save).")
+    parser.add_argument("--profile-json", metavar="FILE",
+                        help="Write the per-page, per-stage profile report to FILE as JSON.")
+    parser.add_argument("--cprofile", metavar="FILE",
+                        help="Dump cProfile stats of the conversion to FILE (main process only).")
 
     args = parser.parse_args()
 
@@ -23,9 +154,28 @@ def main():
             print("Error: Pages must be integers.")
             sys.exit(1)
 
+    # Imported after parsing, so --help does not load PyMuPDF and ezdxf
+    from src.converter import PDF2DXFConverter
     try:
-        converter = PDF2DXFConverter(args.input_pdf)
-        converter.convert(args.output_dxf, pages=pages)
+        converter = PDF2DXFConverter(args.input_pdf, profile=args.profile or bool(args.profile_json),
+                                     images=args.images, **converter_kwargs(args))
+        if args.cprofile:
+            profiling.run_with_cprofile(converter.convert, args.cprofile,
+                                        args.output_dxf, pages=pages, workers=args.jobs,
+                                        archive=args.archive, compression_level=args.compression_level,
+                                        incremental=args.incremental, single_file=args.single_file,
+                                        shared_blocks=args.shared_blocks)
+        else:
+            converter.convert(args.output_dxf, pages=pages, workers=args.jobs,
+                              archive=args.archive, compression_level=args.compression_level,
+                              incremental=args.incremental, single_file=args.single_file,
+                              shared_blocks=args.shared_blocks)
+
+        if args.profile:
+            print(converter.profile.summary())
+        if args.profile_json:
+            with open(args.profile_json, "w") as f:
+                json.dump(converter.profile_report(), f, indent=2)
     except Exception as e:
         print(f"Error: {e}")
         sys.exit(1)
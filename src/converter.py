@@ -1,150 +1,935 @@
 import fitz  # PyMuPDF
 import ezdxf
 from ezdxf.math import Vec3
+import gc
+import io
+import math
+import multiprocessing
 import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# archive and incremental are also convert() parameters, hence the aliases
+try:
+    from . import archive as archive_io
+    from . import incremental as incremental_io
+    from . import blocks, cache, geometry, images, profiling, text
+    from .dxf_stream import DXFStreamWriter
+except ImportError:
+    import archive as archive_io
+    import incremental as incremental_io
+    import blocks
+    import cache
+    import geometry
+    import images
+    import profiling
+    import text
+    from dxf_stream import DXFStreamWriter
+
+# Output layers as (name, color)
+LAYERS = [
+    ('PDF_GEOMETRY', 7), # White/Black
+    ('PDF_TEXT', 1), # Red
+]
+
+# Layer of the IMAGE entities, only created when images are extracted
+IMAGE_LAYER = 'PDF_IMAGES'
+
+BACKENDS = ("ezdxf", "stream")
+
+DXF_FORMATS = ("ascii", "binary")
+
+EXTRACTORS = ("cdrawings", "drawings")
+
+# get_text("dict") flags without TEXT_PRESERVE_IMAGES: image blocks would carry
+# every decoded image of the page, which the text pass never reads
+TEXT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+# Pages between MuPDF store shrinks in low-memory mode
+SHRINK_INTERVAL = 25
+
+# Horizontal gap between pages laid out side by side in a single file (PDF points)
+PAGE_GAP = 50.0
 
 class PDF2DXFConverter:
-    def __init__(self, pdf_path):
+    def __init__(self, pdf_path, backend="ezdxf", use_transformation_matrix=False,
+                 chain_tolerance=None, dedup_tolerance=None, arc_tolerance=None,
+                 merge_text=False, text_entity="mtext", dxf_format="ascii", profile=False,
+                 cache_dir=None, cache_size=cache.DEFAULT_CACHE_SIZE, low_memory=False,
+                 memory_limit=None, symbol_blocks=False, symbol_rotation=False, clip=None,
+                 extractor="cdrawings", images=False):
+        """
+        :param pdf_path: Path to the input PDF file.
+        :param backend: "ezdxf" builds an ezdxf document per output file, "stream"
+                        writes entities straight to disk with constant memory use.
+        :param use_transformation_matrix: Map coordinates with the inverse of
+                        page.transformation_matrix (the PDF's own user space, including
+                        a non-zero MediaBox origin) instead of a plain Y-flip.
+        :param chain_tolerance: If set, connected line segments of a path (end and start
+                        within this distance, in PDF points) are joined into LWPOLYLINEs.
+        :param dedup_tolerance: If set, lines, rects and curves that repeat earlier geometry
+                        of the page within this distance (in either direction) are dropped.
+        :param arc_tolerance: If set, connected Bezier curves that follow a circle within
+                        this distance are written as CIRCLE/ARC entities instead of SPLINEs.
+        :param merge_text: Merge adjacent spans of a text line that share font and size.
+        :param text_entity: "mtext" (default) or "text" for lighter single-line TEXT entities.
+        :param dxf_format: "ascii" (default) or "binary" DXF, which is smaller and faster
+                        to write and to load, with identical entities.
+        :param profile: Record per-page, per-stage timings, item counts and memory deltas,
+                        available from profile_report() after convert().
+        :param cache_dir: Directory of an on-disk page cache. Pages whose content,
+                        resources and conversion options are unchanged reuse the cached DXF.
+        :param cache_size: Size cap of the cache in bytes, least recently used pages are evicted.
+        :param low_memory: Convert strictly one page at a time in this process, and
+                        regularly free MuPDF's object store and Python garbage.
+        :param memory_limit: Memory ceiling in bytes (resident set size, measured with psutil or
+                        /proc/self/statm), implies low_memory.
+                        Past it the document is reopened to drop its caches, and if that
+                        is not enough the conversion stops with a MemoryError.
+        :param symbol_blocks: Paths drawn several times on a page (valves, poles, trees) are
+                        defined once as a BLOCK and placed with INSERTs. ezdxf backend only.
+        :param symbol_rotation: Also match rotated and uniformly scaled copies of a symbol,
+                        implies symbol_blocks.
+        :param clip: Only convert the paths and text inside a region of each page: "cropbox"
+                        (the visible page area) or an (x0, y0, x1, y1) box in PDF points from the
+                        top-left corner of the page. Paths are kept whole if they touch it.
+        :param extractor: "cdrawings" (default) reads paths with page.get_cdrawings(), which
+                        skips building Point/Rect objects, "drawings" with page.get_drawings().
+                        Both give the same output.
+        :param images: Extract embedded raster images to a sidecar directory next to the
+                        output (plans.dxf -> plans_images/) and place them as IMAGE entities.
+                        Each image is written once per document. ezdxf backend, convert() only.
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}', expected one of {', '.join(BACKENDS)}.")
+        if text_entity not in text.TEXT_ENTITIES:
+            raise ValueError(f"Unknown text entity '{text_entity}', expected one of {', '.join(text.TEXT_ENTITIES)}.")
+        if dxf_format not in DXF_FORMATS:
+            raise ValueError(f"Unknown DXF format '{dxf_format}', expected one of {', '.join(DXF_FORMATS)}.")
+        if images and backend != "ezdxf":
+            raise ValueError("Images need the ezdxf backend.")
+        if extractor not in EXTRACTORS:
+            raise ValueError(f"Unknown extractor '{extractor}', expected one of {', '.join(EXTRACTORS)}.")
+        for name, tolerance in (("chain", chain_tolerance), ("dedup", dedup_tolerance), ("arc", arc_tolerance)):
+            if tolerance is not None and not tolerance > 0:
+                raise ValueError(f"Invalid {name} tolerance {tolerance}, expected a positive distance.")
+        if memory_limit is not None and profiling.resident_memory() is None:
+            raise ValueError("A memory limit needs the process's resident memory, which this system "
+                             "does not expose. Install psutil to enable it.")
+        if clip not in (None, "cropbox"):
+            clip = [float(value) for value in clip]
+            if len(clip) != 4 or clip[0] >= clip[2] or clip[1] >= clip[3]:
+                raise ValueError(f"Invalid clip box {clip}, expected (x0, y0, x1, y1) with x0 < x1 and y0 < y1.")
+        symbol_blocks = symbol_blocks or symbol_rotation
+        if symbol_blocks and backend != "ezdxf":
+            raise ValueError("Symbol blocks need the ezdxf backend.")
         self.pdf_path = pdf_path
+        self.pdf_bytes = None
+        self.backend = backend
+        self.use_transformation_matrix = use_transformation_matrix
+        self.chain_tolerance = chain_tolerance
+        self.dedup_tolerance = dedup_tolerance
+        self.arc_tolerance = arc_tolerance
+        self.merge_text = merge_text
+        self.text_entity = text_entity
+        self.dxf_format = dxf_format
+        self.symbol_blocks = symbol_blocks
+        self.symbol_rotation = symbol_rotation
+        self.clip = clip
+        self.extractor = extractor
+        self.images = images
+        self._image_writer = None
+        # xref -> image file name (None if it could not be extracted) of the current conversion
+        self._image_files = {}
+        # xref -> IMAGEDEF of the current DXF document
+        self._image_defs = {}
+        # Symbol fingerprint -> (block name, angle, scale) of the current DXF document
+        self._symbols = {}
+        self.stats = self._new_stats()
+        self.profiling = profile
+        self.profile = None
+        self.cache = cache.PageCache(cache_dir, cache_size) if cache_dir else None
+        self.low_memory = low_memory or memory_limit is not None
+        self.memory_limit = memory_limit
+        self.peak_memory = None
+        self._pages_since_shrink = 0
         self.doc = None
         self.dxf = None
         self.msp = None
         self.verbose = True
 
+    def _page_options(self):
+        """Options that affect page output, used to rebuild the converter in workers."""
+        return {
+            'backend': self.backend,
+            'use_transformation_matrix': self.use_transformation_matrix,
+            'chain_tolerance': self.chain_tolerance,
+            'dedup_tolerance': self.dedup_tolerance,
+            'arc_tolerance': self.arc_tolerance,
+            'merge_text': self.merge_text,
+            'text_entity': self.text_entity,
+            'dxf_format': self.dxf_format,
+            'symbol_blocks': self.symbol_blocks,
+            'symbol_rotation': self.symbol_rotation,
+            'clip': self.clip,
+            'images': self.images,
+        }
+
+    def _worker_kwargs(self):
+        """Constructor arguments for the converter rebuilt in each pool worker."""
+        kwargs = self._page_options()
+        kwargs['profile'] = self.profiling
+        kwargs['low_memory'] = self.low_memory
+        kwargs['memory_limit'] = self.memory_limit
+        kwargs['extractor'] = self.extractor
+        if self.cache:
+            kwargs['cache_dir'] = self.cache.directory
+            kwargs['cache_size'] = self.cache.max_bytes
+        return kwargs
+
+    def _new_stats(self):
+        """Counters for drawing items and text spans read and entities written."""
+        return {'items': 0, 'entities': 0, 'duplicates': 0, 'spans': 0, 'texts': 0, 'cached_pages': 0,
+                'skipped_pages': 0, 'blocks': 0, 'inserts': 0, 'symbols': 0, 'symbol_inserts': 0,
+                'culled_paths': 0, 'images': 0, 'skipped_images': 0}
+
+    def _merge_stats(self, stats):
+        for key, value in stats.items():
+            self.stats[key] += value
+
+    def _report_stats(self):
+        if self.peak_memory is not None:
+            print(f"Memory: peak {self.peak_memory / (1024 * 1024):.0f} MB between pages")
+        if self.stats['skipped_pages']:
+            print(f"Incremental: skipped {self.stats['skipped_pages']} up-to-date page(s)")
+        if self.images:
+            writer = self._image_writer
+            print(f"Images: placed {self.stats['images']}, wrote {writer.count} file(s) to {writer.directory}")
+            if self.stats['skipped_images']:
+                print(f"Skipped {self.stats['skipped_images']} inline or unreadable image(s)")
+        if self.stats['culled_paths']:
+            print(f"Clip: dropped {self.stats['culled_paths']} path(s) outside the clip region")
+        if self.stats['blocks']:
+            print(f"Blocks: {self.stats['blocks']} shared block(s), {self.stats['inserts']} insert(s)")
+        if self.stats['symbols']:
+            print(f"Symbols: {self.stats['symbols']} symbol block(s), {self.stats['symbol_inserts']} insert(s)")
+        if self.cache:
+            print(f"Cache: reused {self.stats['cached_pages']} page(s)")
+        if self.merge_text and self.stats['spans']:
+            print(f"Text: {self.stats['spans']} spans -> {self.stats['texts']} entities")
+        if (self.chain_tolerance, self.dedup_tolerance, self.arc_tolerance) == (None, None, None):
+            return
+        if not self.stats['items']:
+            return
+        items, entities = self.stats['items'], self.stats['entities']
+        saved = items - entities
+        print(f"Geometry: {items} drawing items -> {entities} entities "
+              f"({saved} fewer, {100.0 * saved / items:.1f}%)")
+        if self.dedup_tolerance is not None:
+            print(f"Removed {self.stats['duplicates']} duplicate entities")
+
+    def profile_report(self):
+        """
+        Returns the per-stage report of the last convert() when profiling is enabled:
+        {'pages': {page_num: {stage: {seconds, count, memory_delta}}}, 'totals': {...}}
+        """
+        if self.profile is None:
+            return None
+        return self.profile.report()
+
+    def _stage(self, page_num, name):
+        return profiling.stage(self.profile, page_num, name)
+
+    @classmethod
+    def from_bytes(cls, data, name="document.pdf", **kwargs):
+        """
+        Creates a converter for a PDF held in memory, e.g. an upload.
+        :param data: PDF file content as bytes.
+        :param name: Name used in messages in place of a file path.
+        Other keyword arguments are passed to the constructor.
+        """
+        converter = cls(name, **kwargs)
+        converter.pdf_bytes = bytes(data)
+        return converter
+
     def load_pdf(self):
         """Loads the PDF file."""
+        if self.pdf_bytes is not None:
+            self.doc = fitz.open(stream=self.pdf_bytes, filetype="pdf")
+            return
         if not os.path.exists(self.pdf_path):
             raise FileNotFoundError(f"PDF file not found: {self.pdf_path}")
         self.doc = fitz.open(self.pdf_path)
 
-    def _setup_dxf(self):
-        """Initializes the DXF document with necessary layers."""
+    def _setup_dxf(self, output_path):
+        """
+        Initializes the DXF document with necessary layers.
+        output_path is a file path or a binary buffer.
+        """
+        self._symbols = {}
+        self._image_defs = {}
+        if self.backend == "stream":
+            # The stream writer doubles as the modelspace
+            self.dxf = DXFStreamWriter(output_path, LAYERS, binary=self.dxf_format == "binary")
+            self.msp = self.dxf
+            return
+
         self.dxf = ezdxf.new()
         self.msp = self.dxf.modelspace()
         
         # Create layers
-        self.dxf.layers.new(name='PDF_GEOMETRY', dxfattribs={'color': 7}) # White/Black
-        self.dxf.layers.new(name='PDF_TEXT', dxfattribs={'color': 1}) # Red
+        for name, color in LAYERS:
+            self.dxf.layers.new(name=name, dxfattribs={'color': color})
+        if self.images:
+            self.dxf.layers.new(name=IMAGE_LAYER, dxfattribs={'color': 7})
+
+    def _discard_dxf(self):
+        """Drops the current DXF after an error, the stream writer removes its partial file."""
+        if self.backend == "stream":
+            self.dxf.abort()
 
-    def convert(self, output_path, pages=None):
+    def _save_dxf(self, output_path):
+        """Writes the current DXF document to output_path (a file path or binary buffer)."""
+        if self.backend == "stream":
+            self.dxf.close()
+        elif isinstance(output_path, (str, os.PathLike)):
+            self.dxf.saveas(output_path, fmt="bin" if self.dxf_format == "binary" else "asc")
+        elif self.dxf_format == "binary":
+            self.dxf.write(output_path, fmt="bin")
+        else:
+            text_stream = io.StringIO()
+            self.dxf.write(text_stream)
+            output_path.write(self.dxf.encode(text_stream.getvalue()))
+
+    def convert(self, output_path, pages=None, workers=1, archive=None, compression_level=6,
+                incremental=False, single_file=False, shared_blocks=False):
         """
         Converts PDF pages to DXF.
         :param output_path: Path to save the DXF file.
         :param pages: List of page numbers to convert (0-indexed). If None, converts all.
+        :param workers: Number of worker processes used when converting several pages.
+                        1 converts in this process, 0 or None uses one worker per CPU.
+        :param archive: "zip" or "tar" to stream the page DXFs into a single archive
+                        as each page finishes, instead of writing separate files.
+        :param compression_level: Archive compression level, 0 (store) to 9.
+        :param incremental: Skip pages whose DXF is still current according to the
+                        sidecar state file next to output_path, see incremental.py.
+        :param single_file: Write all pages into output_path, side by side from left to
+                        right with PAGE_GAP between them, instead of one file per page.
+        :param shared_blocks: Define content repeated at the same place on several pages
+                        (title blocks, borders, legends) once as a BLOCK and INSERT it on
+                        each page. Implies single_file, ezdxf backend only.
+        :return: List of generated DXF file paths (the archive path in archive mode).
         """
+        if archive and incremental:
+            raise ValueError("Incremental conversion writes separate files and cannot be combined with archive output.")
+        single_file = single_file or shared_blocks
+        if single_file and (archive or incremental):
+            raise ValueError("Single-file output cannot be combined with archive output or incremental conversion.")
+        if shared_blocks and self.backend != "ezdxf":
+            raise ValueError("Shared blocks need the ezdxf backend.")
+        if self.images and archive:
+            raise ValueError("Images are written as sidecar files and cannot be combined with archive output.")
+        pages = self._start(pages)
+        generated_files = []
+
+        if workers is None or workers < 1:
+            workers = os.cpu_count() or 1
+        if self.pdf_bytes is not None or self.low_memory or self.images:
+            # Workers open the PDF by path, low-memory mode keeps to one page at a time
+            # and images are only extracted once per document in this process
+            workers = 1
+
+        if self.images:
+            # Written by a background thread, each image once per document
+            self._image_writer = images.ImageWriter(images.image_directory(output_path))
+        try:
+            if archive:
+                generated_files.append(self._convert_archive(output_path, pages, workers, archive,
+                                                             compression_level))
+            elif single_file:
+                self._convert_single_file(output_path, pages, shared_blocks)
+                generated_files.append(output_path)
+                if self.verbose:
+                    print(f"DXF saved to {output_path}")
+            elif incremental and len(self.doc):
+                generated_files = self._convert_incremental(output_path, pages, workers)
+            # Check if we need to split into multiple files
+            elif len(pages) > 1:
+                jobs = self._page_jobs(output_path, pages)
+
+                if workers > 1 and len(jobs) > 1:
+                    generated_files = self._convert_parallel(jobs, workers)
+                else:
+                    for page_num, page_output_path in jobs:
+                        self._save_page(page_num, page_output_path)
+                        generated_files.append(page_output_path)
+                        if self.verbose:
+                            print(f"Saved page {page_num + 1} to {page_output_path}")
+            else:
+                # Single page case (or user selected just one page)
+                self._save_single(pages, output_path)
+                generated_files.append(output_path)
+                if self.verbose:
+                    print(f"DXF saved to {output_path}")
+        finally:
+            if self._image_writer is not None:
+                self._image_writer.close()
+            if self.cache:
+                # Once per conversion, pages stored by workers included
+                self.cache.evict()
+
+        if self.verbose:
+            self._report_stats()
+        return generated_files
+
+    def convert_to_bytes(self, output_name="output.dxf", pages=None):
+        """
+        Converts PDF pages to in-memory DXF files without touching the disk.
+        Combine with from_bytes() for a fully in-memory conversion.
+        :param output_name: File name used to name the results, as convert() would.
+        :param pages: List of page numbers to convert (0-indexed). If None, converts all.
+        :return: List of (file_name, dxf_bytes) tuples.
+        """
+        if self.images:
+            raise ValueError("Images are written as sidecar files, use convert() with an output path.")
+        pages = self._start(pages)
+        outputs = []
+        try:
+            if len(pages) > 1:
+                for page_num, page_name in self._page_jobs(output_name, pages):
+                    buffer = io.BytesIO()
+                    self._save_page(page_num, buffer)
+                    outputs.append((page_name, buffer.getvalue()))
+            else:
+                buffer = io.BytesIO()
+                self._save_single(pages, buffer)
+                outputs.append((output_name, buffer.getvalue()))
+        finally:
+            if self.cache:
+                self.cache.evict()
+
+        if self.verbose:
+            self._report_stats()
+        return outputs
+
+    def _convert_archive(self, output_path, pages, workers, fmt, compression_level):
+        """
+        Writes every page into one ZIP/tar archive as soon as it is converted,
+        so only one finished page at a time (per worker) is held in memory.
+        """
+        path = archive_io.archive_path(output_path, fmt, compression_level)
+        dxf_name = os.path.basename(path[:-len(archive_io.archive_extension(fmt, compression_level))]) + ".dxf"
+        if len(pages) > 1:
+            jobs = self._page_jobs(dxf_name, pages)
+        else:
+            jobs = [(page_num, dxf_name) for page_num in pages]
+        if not jobs:
+            raise ValueError("No pages to convert.")
+
+        with archive_io.ArchiveWriter(path, fmt, compression_level) as writer:
+            if workers > 1 and len(jobs) > 1:
+                results = self._run_pool(jobs, workers, in_memory=True)
+            else:
+                results = self._iter_page_bytes(jobs)
+            for page_num, name, data in results:
+                writer.add(name, data)
+                if self.verbose:
+                    print(f"Added page {page_num + 1} to {path} as {name}")
+                del data
+        return path
+
+    def _convert_incremental(self, output_path, pages, workers):
+        """
+        Converts only the pages whose output is missing or stale, and records
+        the converted ones in the sidecar state file.
+        """
+        jobs = self._page_jobs(output_path, pages)
+        if len(pages) == 1:
+            # A single page keeps the plain output name
+            jobs = [(page_num, output_path) for page_num, _ in jobs]
+
+        state = incremental_io.ConversionState(incremental_io.state_path(output_path), self.pdf_path,
+                                            self._page_options(), self.pdf_bytes)
+        stale = []
+        for page_num, page_output_path in jobs:
+            if state.is_current(self.doc, page_num, page_output_path):
+                self.stats['skipped_pages'] += 1
+                if self.verbose:
+                    print(f"Page {page_num + 1} is up to date: {page_output_path}")
+            else:
+                stale.append((page_num, page_output_path))
+
+        if workers > 1 and len(stale) > 1:
+            results = self._run_pool(stale, workers)
+        else:
+            results = self._iter_saved_pages(stale)
+        try:
+            for page_num, page_output_path, _ in results:
+                state.record(page_num, page_output_path,
+                             cache.page_fingerprint(self.doc, self.doc[page_num]))
+                if self.verbose:
+                    print(f"Saved page {page_num + 1} to {page_output_path}")
+        finally:
+            # Keep what was converted before an error or interrupt
+            state.save()
+        return [page_output_path for _, page_output_path in jobs]
+
+    def _convert_single_file(self, output_path, pages, shared_blocks):
+        """
+        Converts pages into one DXF, each page shifted right of the previous one.
+        With shared_blocks all pages are extracted first, so that content they
+        have in common can be written once as a block.
+        """
+        page_nums = [page_num for page_num, _ in self._page_jobs(output_path, pages)]
+        offsets = {}
+        x_offset = 0.0
+        for page_num in page_nums:
+            offsets[page_num] = x_offset
+            x_offset += self.doc[page_num].rect.width + PAGE_GAP
+
+        self._setup_dxf(output_path)
+        try:
+            if not shared_blocks:
+                for page_num in page_nums:
+                    self._convert_page(self.doc[page_num], offsets[page_num])
+            else:
+                # Page coordinates, so that repeated content compares equal across pages
+                page_items = {page_num: self._extract_items(self.doc[page_num],
+                                                            self._page_matrix(self.doc[page_num], 0))
+                              for page_num in page_nums}
+                shared = blocks.SharedContent(page_items)
+                for name, (page_num, items) in shared.blocks.items():
+                    self._add_items(page_num, items, self.dxf.blocks.new(name))
+                self.stats['blocks'] += len(shared.blocks)
+
+                for page_num in page_nums:
+                    page = self.doc[page_num]
+                    if self.images:
+                        self._add_images(page, self._page_matrix(page, offsets[page_num]))
+                    items = shared.own_items(page_num, page_items.pop(page_num))
+                    items.points[:, 0] += offsets[page_num]
+                    self._add_items(page_num, items)
+                    for name in shared.page_blocks(page_num):
+                        self.msp.add_blockref(name, (offsets[page_num], 0), dxfattribs={'layer': 'PDF_GEOMETRY'})
+                        self.stats['inserts'] += 1
+                    self._add_page_text(page, self._page_matrix(page, offsets[page_num]))
+            # Profiled as part of the last page
+            with self._stage(page_nums[-1] if page_nums else 0, "save"):
+                self._save_dxf(output_path)
+        except BaseException:
+            self._discard_dxf()
+            raise
+
+    def _iter_saved_pages(self, jobs):
+        """Serial counterpart of _run_pool: saves each page and yields (page_num, path, None)."""
+        for page_num, page_output_path in jobs:
+            self._save_page(page_num, page_output_path)
+            yield page_num, page_output_path, None
+
+    def _iter_page_bytes(self, jobs):
+        """Yields (page_num, name, dxf_bytes) for (page_num, name) jobs, one page at a time."""
+        for page_num, name in jobs:
+            buffer = io.BytesIO()
+            self._save_single([page_num], buffer)
+            yield page_num, name, buffer.getvalue()
+
+    def _start(self, pages):
+        """Opens the PDF if needed, resets stats and returns the pages to convert."""
         if not self.doc:
             self.load_pdf()
-        
+        self.stats = self._new_stats()
+        self.profile = profiling.ConversionProfile() if self.profiling else None
+        self.peak_memory = None
+        self._pages_since_shrink = 0
+        self._image_files = {}
         if pages is None:
             pages = range(len(self.doc))
+        return pages
 
-        # Check if we need to split into multiple files
-        if len(pages) > 1:
-            base, ext = os.path.splitext(output_path)
-            for i, page_num in enumerate(pages):
-                if page_num >= len(self.doc):
-                    print(f"Warning: Page {page_num} out of range.")
-                    continue
-                
-                # Create a new DXF for each page
-                self._setup_dxf()
-                page = self.doc[page_num]
-                self._convert_page(page, 0) # No offset needed for separate files
-                
-                # Construct new filename
-                # Use page_num + 1 for 1-based indexing in filename
-                page_output_path = f"{base}_page_{page_num + 1}{ext}"
-                self.dxf.saveas(page_output_path)
-                if self.verbose:
-                    print(f"Saved page {page_num + 1} to {page_output_path}")
+    def _page_jobs(self, output_path, pages):
+        """Returns (page_num, page_output_path) for each valid page of a multi-page conversion."""
+        base, ext = os.path.splitext(output_path)
+        jobs = []
+        for page_num in pages:
+            if page_num >= len(self.doc):
+                print(f"Warning: Page {page_num} out of range.")
+                continue
+            # Construct new filename
+            # Use page_num + 1 for 1-based indexing in filename
+            jobs.append((page_num, f"{base}_page_{page_num + 1}{ext}"))
+        return jobs
+
+    def _save_single(self, pages, output):
+        """Single page case (or user selected just one page)."""
+        if pages and pages[0] < len(self.doc):
+            self._save_page(pages[0], output)
         else:
-            # Single page case (or user selected just one page)
-            self._setup_dxf()
-            if pages:
-                page_num = pages[0]
-                if page_num < len(self.doc):
-                    self._convert_page(self.doc[page_num], 0)
-            self.dxf.saveas(output_path)
+            self._setup_dxf(output)
+            self._save_dxf(output)
+
+    def _save_page(self, page_num, page_output_path):
+        """
+        Converts a single page into its own DXF file.
+        page_output_path may also be a binary buffer such as io.BytesIO.
+        """
+        key = None
+        # Cached pages would reference images next to another output
+        if self.cache and not self.images:
+            with self._stage(page_num, "cache") as stage:
+                page = self.doc[page_num]
+                key = cache.cache_key(cache.page_fingerprint(self.doc, page), self._page_options())
+                stage.count = int(self.cache.fetch(key, page_output_path))
+            if stage.count:
+                self.stats['cached_pages'] += 1
+                if self.low_memory:
+                    self._release_memory()
+                return
+
+        # Create a new DXF for each page
+        self._setup_dxf(page_output_path)
+        try:
+            self._convert_page(self.doc[page_num], 0) # No offset needed for separate files
+            with self._stage(page_num, "save"):
+                self._save_dxf(page_output_path)
+        except BaseException:
+            self._discard_dxf()
+            raise
+        if key:
+            self.cache.store(key, page_output_path)
+        if self.low_memory:
+            self._release_memory()
+
+    def _release_memory(self):
+        """
+        Low-memory housekeeping after each page: frees MuPDF's object store every
+        SHRINK_INTERVAL pages and enforces memory_limit.
+        """
+        self._pages_since_shrink += 1
+        usage = profiling.resident_memory()
+        over_limit = self.memory_limit is not None and usage is not None and usage > self.memory_limit
+        if self._pages_since_shrink < SHRINK_INTERVAL and not over_limit:
+            self._track_memory(usage)
+            return
+
+        self._pages_since_shrink = 0
+        gc.collect()
+        fitz.TOOLS.store_shrink(100)
+        if over_limit:
+            # Reopening the document also drops its parsed objects and loaded fonts
+            self.doc.close()
+            self.load_pdf()
+            fitz.TOOLS.store_shrink(100)
+        usage = profiling.resident_memory()
+        self._track_memory(usage)
+        if self.memory_limit is not None and usage is not None and usage > self.memory_limit:
+            raise MemoryError(f"Memory use of {usage // (1024 * 1024)} MB exceeds the limit of "
+                              f"{self.memory_limit // (1024 * 1024)} MB")
+
+    def _track_memory(self, usage):
+        if usage is not None and (self.peak_memory is None or usage > self.peak_memory):
+            self.peak_memory = usage
+
+    def _convert_parallel(self, jobs, workers):
+        """
+        Distributes (page_num, output_path) jobs over a process pool.
+        Each worker opens its own copy of the PDF, since PyMuPDF documents
+        cannot be shared between processes or threads.
+        """
+        generated_files = []
+        for page_num, page_output_path, _ in self._run_pool(jobs, workers):
+            generated_files.append(page_output_path)
             if self.verbose:
-                print(f"DXF saved to {output_path}")
+                print(f"Saved page {page_num + 1} to {page_output_path}")
+        return generated_files
+
+    def _run_pool(self, jobs, workers, in_memory=False):
+        """
+        Runs (page_num, output_path) jobs in a process pool and yields
+        (page_num, output_path, dxf_bytes) in job order. With in_memory, workers
+        return the DXF as bytes instead of writing output_path. At most two jobs
+        per worker are in flight, which bounds the results held in memory.
+        """
+        kwargs = self._worker_kwargs()
+        pending = deque()
+        remaining = iter(jobs)
+
+        def submit_next():
+            for page_num, page_output_path in remaining:
+                target = None if in_memory else page_output_path
+                future = pool.submit(_convert_page_job, self.pdf_path, kwargs, page_num, target)
+                pending.append((page_num, page_output_path, future))
+                return
+
+        # Spawned, not forked: this process holds an open MuPDF document
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), mp_context=context) as pool:
+            for _ in range(2 * workers):
+                submit_next()
+            # Collect in submission order so the result matches the serial path
+            while pending:
+                page_num, page_output_path, future = pending.popleft()
+                stats, profile_pages, data = future.result()
+                self._merge_stats(stats)
+                if profile_pages:
+                    self.profile.merge(profile_pages)
+                submit_next()
+                yield page_num, page_output_path, data
 
     def _convert_page(self, page, x_offset):
         """Extracts vector graphics and text from a single page and adds to DXF."""
-        page_height = page.rect.height
+        matrix = self._page_matrix(page, x_offset)
+
+        # Images first, so the vectors are drawn on top of them
+        if self.images:
+            self._add_images(page, matrix)
 
         # 1. Extract Drawings (Vectors)
-        paths = page.get_drawings()
-        for path in paths:
-            for item in path["items"]:
-                cmd = item[0]
-                if cmd == "l":  # Line
-                    p1 = item[1]
-                    p2 = item[2]
-                    self.msp.add_line(
-                        self._transform_point(p1, x_offset, page_height),
-                        self._transform_point(p2, x_offset, page_height),
-                        dxfattribs={'layer': 'PDF_GEOMETRY'}
-                    )
-                elif cmd == "c":  # Cubic Bezier
-                    p1 = item[1]
-                    p2 = item[2]
-                    p3 = item[3]
-                    p4 = item[4]
-                    control_points = [
-                        self._transform_point(p1, x_offset, page_height),
-                        self._transform_point(p2, x_offset, page_height),
-                        self._transform_point(p3, x_offset, page_height),
-                        self._transform_point(p4, x_offset, page_height)
-                    ]
-                    self.msp.add_spline(control_points, degree=3, dxfattribs={'layer': 'PDF_GEOMETRY'})
-                elif cmd == "re": # Rectangle
-                    rect = item[1]
-                    p1 = (rect.x0, rect.y0)
-                    p2 = (rect.x1, rect.y0)
-                    p3 = (rect.x1, rect.y1)
-                    p4 = (rect.x0, rect.y1)
-                    
-                    points = [p1, p2, p3, p4, p1] # Closed loop
-                    dxf_points = [self._transform_point(p, x_offset, page_height) for p in points]
-                    self.msp.add_lwpolyline(dxf_points, dxfattribs={'layer': 'PDF_GEOMETRY'})
+        items = self._extract_items(page, matrix)
+        self._add_items(page.number, items)
+        # Free the page's vertices before its text is extracted
+        del items
 
         # 2. Extract Text
-        text_dict = page.get_text("dict")
-        for block in text_dict.get("blocks", []):
-            if block["type"] == 0: # Text block
-                for line in block["lines"]:
-                    for span in line["spans"]:
-                        text = span["text"]
-                        if not text.strip():
-                            continue
-                        
-                        # Font size and origin
-                        size = span["size"]
-                        origin = span["origin"] # (x, y)
-                        
-                        # Transform origin
-                        insert_point = self._transform_point(origin, x_offset, page_height)
-                        
-                        # Add MTEXT
-                        self.msp.add_mtext(
-                            text,
-                            dxfattribs={
-                                'char_height': size,
-                                'insert': insert_point,
-                                'attachment_point': 7, # BottomLeft
-                                'layer': 'PDF_TEXT'
-                            }
-                        )
-
-    def _transform_point(self, point, x_offset, page_height):
-        """
-        Transforms a PDF point (x, y) to DXF coordinates.
-        Flips Y axis.
-        """
-        # point might be a fitz.Point or tuple
-        x, y = point[0], point[1]
-        
-        # Flip Y: new_y = page_height - old_y
-        new_y = page_height - y
-        
-        return (x + x_offset, new_y)
+        self._add_page_text(page, matrix)
+
+    def _extract_items(self, page, matrix):
+        """Returns the drawing items of page as PageItems, transformed by matrix."""
+        page_num = page.number
+        with self._stage(page_num, "get_drawings") as stage:
+            paths = geometry.get_paths(page, self.extractor)
+            box = geometry.clip_box(page, self.clip)
+            if box is not None:
+                # Culled before any vertex is collected or transformed
+                kept = geometry.cull_paths(paths, box)
+                self.stats['culled_paths'] += len(paths) - len(kept)
+                paths = kept
+            stage.count = len(paths)
+
+        # All vertices of the page are transformed in one vectorized step
+        with self._stage(page_num, "transform") as stage:
+            items = geometry.collect_items(paths)
+            items.points = geometry.transform_points(items.points, matrix)
+            stage.count = len(items.points)
+        del paths
+        self.stats['items'] += len(items)
+        return items
+
+    def _add_items(self, page_num, items, layout=None):
+        """
+        Writes PageItems as DXF geometry, with the chaining, arc fitting and
+        duplicate removal options, into layout (default: the modelspace).
+        """
+        if self.symbol_blocks:
+            with self._stage(page_num, "symbols") as stage:
+                inserts_before = self.stats['symbol_inserts']
+                items = self._add_symbols(items, layout)
+                stage.count = self.stats['symbol_inserts'] - inserts_before
+
+        with self._stage(page_num, "geometry") as stage:
+            entities_before = self.stats['entities']
+            self._write_entities(items, layout)
+            stage.count = self.stats['entities'] - entities_before
+
+    def _write_entities(self, items, layout=None):
+        entities = geometry.to_entities(items, self.chain_tolerance, self.arc_tolerance)
+        duplicates = None
+        if self.dedup_tolerance is not None:
+            duplicates = geometry.DuplicateFilter(self.dedup_tolerance)
+            entities = duplicates.filter(entities)
+        for kind, points, extra in entities:
+            self._add_geometry(kind, points, extra, layout)
+        if duplicates:
+            self.stats['duplicates'] += duplicates.dropped
+
+    def _add_symbols(self, items, layout=None):
+        """
+        Writes the paths that repeat on the page as INSERTs of one block per symbol
+        and returns the remaining items. Blocks are reused by later pages of the same DXF.
+        """
+        msp = self.msp if layout is None else layout
+        keep = np.ones(len(items), dtype=bool)
+        for fp, occurrences in blocks.find_symbols(items, self.symbol_rotation).items():
+            if fp not in self._symbols:
+                if len(occurrences) < blocks.MIN_SYMBOL_COUNT:
+                    continue
+                # The first occurrence, moved to the origin, defines the block
+                path_range, origin, angle, scale = occurrences[0]
+                symbol_items = blocks.path_items(items, path_range)
+                symbol_items.points -= origin
+                entities = list(geometry.to_entities(symbol_items, self.chain_tolerance, self.arc_tolerance))
+                if len(entities) < blocks.MIN_SYMBOL_ENTITIES:
+                    # e.g. a circle, an INSERT would not be any smaller
+                    self._symbols[fp] = None
+                    continue
+                name = f"SYMBOL_{self.stats['symbols'] + 1}"
+                self._write_entities(symbol_items, self.dxf.blocks.new(name))
+                self._symbols[fp] = (name, angle, scale)
+                self.stats['symbols'] += 1
+            if self._symbols[fp] is None:
+                continue
+
+            name, block_angle, block_scale = self._symbols[fp]
+            for (item_start, item_end, _, _), origin, angle, scale in occurrences:
+                dxfattribs = {'layer': 'PDF_GEOMETRY'}
+                if self.symbol_rotation:
+                    dxfattribs['rotation'] = math.degrees(angle - block_angle)
+                    dxfattribs['xscale'] = dxfattribs['yscale'] = scale / block_scale
+                msp.add_blockref(name, origin.tolist(), dxfattribs=dxfattribs)
+                keep[item_start:item_end] = False
+                self.stats['symbol_inserts'] += 1
+        if keep.all():
+            return items
+        return items.subset(keep)
+
+    def _add_images(self, page, matrix):
+        """Places the images of page as IMAGE entities, extracting each new one to the sidecar directory."""
+        with self._stage(page.number, "images") as stage:
+            placed = 0
+            for info in page.get_image_info(xrefs=True):
+                name = self._image_file(info['xref'])
+                if name is None:
+                    self.stats['skipped_images'] += 1
+                    continue
+                width, height = info['width'], info['height']
+                image_def = self._image_defs.get(info['xref'])
+                if image_def is None:
+                    # Relative to the DXF, which sits next to the image directory
+                    path = os.path.basename(self._image_writer.directory) + "/" + name
+                    image_def = self.dxf.add_image_def(filename=path, size_in_pixel=(width, height))
+                    self._image_defs[info['xref']] = image_def
+                insert, u_pixel, v_pixel = images.placement(info['transform'], width, height, matrix)
+                image = self.msp.add_image(image_def, insert, (width, height), dxfattribs={'layer': IMAGE_LAYER})
+                # Exact placement, including rotation, skew and mirroring
+                image.dxf.u_pixel = Vec3(u_pixel)
+                image.dxf.v_pixel = Vec3(v_pixel)
+                placed += 1
+            self.stats['images'] += placed
+            stage.count = placed
+
+    def _image_file(self, xref):
+        """
+        Returns the sidecar file name of image xref, reading the image and queuing
+        it for the writer thread the first time. None for inline images (xref 0)
+        and images that cannot be read.
+        """
+        if xref in self._image_files:
+            return self._image_files[xref]
+        name = None
+        if xref:
+            try:
+                name = self._queue_image(xref)
+            except (RuntimeError, ValueError) as e:
+                print(f"Warning: Could not extract image {xref}: {e}")
+        self._image_files[xref] = name
+        return name
+
+    def _queue_image(self, xref):
+        if self.doc.xref_get_key(xref, "Filter")[1] == "/DCTDecode":
+            info = self.doc.extract_image(xref)
+            if info["colorspace"] in (1, 3):
+                # Gray or RGB JPEG, written as stored in the PDF
+                name = f"image_{xref}.jpg"
+                self._image_writer.add(name, data=info["image"])
+                return name
+        pixmap = fitz.Pixmap(self.doc, xref)
+        if pixmap.colorspace is not None and pixmap.colorspace.n not in (1, 3):
+            pixmap = fitz.Pixmap(fitz.csRGB, pixmap)
+        if pixmap.n not in images.PNG_COLOR_TYPES:
+            return None
+        # Decoded here, PNG encoding happens on the writer thread
+        name = f"image_{xref}.png"
+        self._image_writer.add(name, png=(pixmap.width, pixmap.height, pixmap.n, pixmap.samples))
+        return name
+
+    def _add_page_text(self, page, matrix):
+        page_num = page.number
+        with self._stage(page_num, "get_text") as stage:
+            text_dict = page.get_text("dict", clip=geometry.clip_box(page, self.clip), flags=TEXT_FLAGS)
+            stage.count = len(text_dict.get("blocks", []))
+
+        with self._stage(page_num, "text") as stage:
+            stage.count = self._add_text(text_dict, matrix)
+
+    def _add_text(self, text_dict, matrix):
+        """Adds the text spans of a get_text("dict") result, returns the entity count."""
+        spans = text.collect_spans(text_dict, merge=self.merge_text)
+        self.stats['spans'] += text.count_spans(text_dict) if self.merge_text else len(spans)
+        self.stats['texts'] += len(spans)
+        if not spans:
+            return 0
+
+        # Transform all origins at once
+        origins = geometry.as_points([span["origin"] for span in spans])
+        insert_points = geometry.transform_points(origins, matrix).tolist()
+        for span, insert_point in zip(spans, insert_points):
+            if self.text_entity == "text":
+                # Single-line TEXT, inserted on the baseline
+                self.msp.add_text(
+                    span["text"],
+                    dxfattribs={
+                        'height': span["size"],
+                        'insert': insert_point,
+                        'layer': 'PDF_TEXT'
+                    }
+                )
+                continue
+
+            # Add MTEXT
+            self.msp.add_mtext(
+                span["text"],
+                dxfattribs={
+                    'char_height': span["size"],
+                    'insert': insert_point,
+                    'attachment_point': 7, # BottomLeft
+                    'layer': 'PDF_TEXT'
+                }
+            )
+        return len(spans)
+
+    def _add_geometry(self, kind, points, extra, layout=None):
+        """Adds one geometry entity produced by geometry.to_entities to layout (default: the modelspace)."""
+        msp = self.msp if layout is None else layout
+        self.stats['entities'] += 1
+        if kind == "line":
+            msp.add_line(points[0], points[1], dxfattribs={'layer': 'PDF_GEOMETRY'})
+        elif kind == "spline":  # Cubic Bezier
+            msp.add_spline(points, degree=3, dxfattribs={'layer': 'PDF_GEOMETRY'})
+        elif kind == "polyline":
+            msp.add_lwpolyline(points, close=extra, dxfattribs={'layer': 'PDF_GEOMETRY'})
+        elif kind == "circle":
+            msp.add_circle(points[0], extra, dxfattribs={'layer': 'PDF_GEOMETRY'})
+        elif kind == "arc":
+            radius, start_angle, end_angle = extra
+            msp.add_arc(points[0], radius, start_angle, end_angle,
+                        dxfattribs={'layer': 'PDF_GEOMETRY'})
+
+    def _page_matrix(self, page, x_offset):
+        """Returns the affine matrix mapping page coordinates to DXF coordinates."""
+        if self.use_transformation_matrix:
+            # MuPDF page space back to the PDF's own user space
+            m = ~page.transformation_matrix
+            return (m.a, m.b, m.c, m.d, m.e + x_offset, m.f)
+        return geometry.page_matrix(page.rect.height, x_offset)
+
+
+def _convert_page_job(pdf_path, kwargs, page_num, page_output_path):
+    """
+    Process pool entry point: converts one page in a fresh converter.
+    Returns its stats, the recorded page stages when profiling, and the DXF
+    bytes when page_output_path is None.
+    """
+    converter = PDF2DXFConverter(pdf_path, **kwargs)
+    converter.verbose = False
+    if converter.profiling:
+        converter.profile = profiling.ConversionProfile()
+    converter.load_pdf()
+    buffer = io.BytesIO() if page_output_path is None else None
+    try:
+        converter._save_page(page_num, page_output_path or buffer)
+    finally:
+        converter.doc.close()
+    data = buffer.getvalue() if buffer else None
+    return converter.stats, converter.profile.pages if converter.profile else None, data
@@ -0,0 +1,115 @@
+import math
+
+import numpy as np
+
+# Bezier parameters sampled when testing a curve against a circle
+SAMPLE_T = np.linspace(0.0, 1.0, 9)
+
+# Runs sweeping less than this (degrees) are left as splines: a nearly straight
+# curve fits a huge circle within any tolerance, which is not worth an ARC.
+MIN_SWEEP = 5.0
+
+# A circle drawn as 4 cubic Beziers is off the true circle by up to ~2.7e-4 of its
+# radius, so this share of the radius is allowed on top of the tolerance.
+BEZIER_CIRCLE_ERROR = 3e-4
+
+
+def _sample(control_points):
+    """Samples points along cubic Beziers given as a (K, 4, 2) array."""
+    t = SAMPLE_T[:, None]
+    mt = 1.0 - t
+    p0, p1, p2, p3 = (control_points[:, i][:, None, :] for i in range(4))
+    points = mt ** 3 * p0 + 3 * mt ** 2 * t * p1 + 3 * mt * t ** 2 * p2 + t ** 3 * p3
+    # Consecutive curves share their end/start point, sample it once
+    first = points[:1, :1].reshape(-1, 2)
+    return np.vstack((first, points[:, 1:].reshape(-1, 2)))
+
+
+def fit_circle(points):
+    """
+    Least-squares (Kasa) circle through an (N, 2) array of points.
+    :return: (cx, cy, radius, max_deviation) or None if the points are collinear.
+    """
+    mean = points.mean(axis=0)
+    local = points - mean
+    a = np.column_stack((2 * local, np.ones(len(local))))
+    b = (local ** 2).sum(axis=1)
+    solution, _, rank, _ = np.linalg.lstsq(a, b, rcond=None)
+    if rank < 3:
+        return None
+    cx, cy, c = solution
+    radius = math.sqrt(max(c + cx * cx + cy * cy, 0.0))
+    deviation = np.abs(np.hypot(local[:, 0] - cx, local[:, 1] - cy) - radius).max()
+    return cx + mean[0], cy + mean[1], radius, float(deviation)
+
+
+def _sweep(points, cx, cy):
+    """Signed angle (degrees) travelled by the points around the center."""
+    angles = np.unwrap(np.arctan2(points[:, 1] - cy, points[:, 0] - cx))
+    return math.degrees(angles[-1] - angles[0])
+
+
+def _as_arc(control_points, tolerance):
+    """
+    Returns ("circle", [center], radius) or ("arc", [center], (radius, start, end))
+    if the Beziers follow a circle within tolerance plus the Bezier approximation
+    error, otherwise None.
+    """
+    points = _sample(control_points)
+    fit = fit_circle(points)
+    if fit is None:
+        return None
+    cx, cy, radius, deviation = fit
+    if deviation > tolerance + BEZIER_CIRCLE_ERROR * radius:
+        return None
+    sweep = _sweep(points, cx, cy)
+    if abs(sweep) < MIN_SWEEP:
+        return None
+    center = [cx, cy]
+    if abs(sweep) >= 360.0 - MIN_SWEEP and np.abs(points[0] - points[-1]).max() <= tolerance:
+        return "circle", [center], radius
+
+    start = math.degrees(math.atan2(points[0][1] - cy, points[0][0] - cx))
+    end = math.degrees(math.atan2(points[-1][1] - cy, points[-1][0] - cx))
+    if sweep < 0:
+        # DXF arcs run counter-clockwise
+        start, end = end, start
+    return "arc", [center], (radius, start % 360.0, end % 360.0)
+
+
+def fit_arcs(curves, tolerance):
+    """
+    Replaces runs of connected cubic Beziers that approximate a circle or a
+    circular arc with CIRCLE/ARC geometry.
+    :param curves: List of Bezier control point lists ([p0, p1, p2, p3]) of one path,
+                   in drawing order.
+    :param tolerance: Maximum distance between the curves and the fitted circle,
+                      besides the error of drawing a circle with Beziers.
+    :return: List of (kind, points, extra) entities: "circle", "arc" or "spline".
+    """
+    control = np.array(curves, dtype=np.float64).reshape(-1, 4, 2)
+    entities = []
+    i = 0
+    while i < len(curves):
+        best = None
+        j = i
+        while j < len(curves):
+            if j > i and np.abs(control[j, 0] - control[j - 1, 3]).max() > tolerance:
+                break # Not connected
+            arc = _as_arc(control[i:j + 1], tolerance)
+            if arc is None and j > i:
+                break
+            if arc is not None:
+                best = (j, arc)
+                if arc[0] == "circle":
+                    break
+            j += 1
+
+        if best is None:
+            entities.append(("spline", curves[i], None))
+            i += 1
+        else:
+            j, (kind, center, extra) = best
+            entities.append((kind, center, extra))
+            i = j + 1
+    return entities
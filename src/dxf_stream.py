@@ -0,0 +1,213 @@
+import io
+import os
+
+import ezdxf
+from ezdxf.lldxf.tagwriter import BinaryTagWriter
+
+# Width of the $HANDSEED value, padded so it can be patched in place once the
+# number of streamed entities is known.
+HANDSEED_WIDTH = 16
+
+
+class DXFStreamWriter:
+    """
+    Writes a DXF file without building an ezdxf document for its entities.
+
+    The HEADER, TABLES (including the layers) and BLOCKS sections come from an
+    empty ezdxf document, so the file has everything CAD tools expect. Entities
+    are then written straight into the ENTITIES section as they are added, which
+    keeps memory flat regardless of the entity count.
+
+    The add_* methods mirror the subset of the ezdxf modelspace API used by the
+    converter, so the writer can stand in for ``msp``.
+
+    Entities are always formatted as ASCII DXF tags; for binary DXF they are
+    re-encoded by ezdxf's BinaryTagWriter on the way out.
+    """
+
+    def __init__(self, output_path, layers, binary=False):
+        """
+        :param output_path: Path of the DXF file to write, or a seekable binary
+                            stream such as io.BytesIO, which is left open on close().
+        :param layers: List of (name, color) tuples for the LAYER table.
+        :param binary: Write binary instead of ASCII DXF.
+        """
+        self.output_path = output_path
+        self.binary = binary
+        self.count = 0
+
+        skeleton = ezdxf.new()
+        for name, color in layers:
+            skeleton.layers.new(name=name, dxfattribs={'color': color})
+        self.owner = skeleton.modelspace().block_record_handle
+
+        buffer = io.StringIO()
+        skeleton.write(buffer)
+        text = buffer.getvalue()
+
+        marker = "  0\nSECTION\n  2\nENTITIES\n"
+        split = text.index(marker) + len(marker)
+        head, self._tail = text[:split], text[split:]
+
+        # Streamed entities take handles from the skeleton's seed onwards
+        seed_tag = "$HANDSEED\n  5\n"
+        seed_start = head.index(seed_tag) + len(seed_tag)
+        seed_end = head.index("\n", seed_start)
+        self._next_handle = int(head[seed_start:seed_end], 16)
+        seed = self._format_handle(self._next_handle).rjust(HANDSEED_WIDTH, "0")
+
+        if binary:
+            if isinstance(output_path, (str, os.PathLike)):
+                self._stream = open(output_path, "wb")
+                self._owns_stream = True
+            else:
+                self._stream = output_path
+                self._owns_stream = False
+            tags = BinaryTagWriter(self._stream, skeleton.dxfversion, encoding=skeleton.output_encoding)
+            self._write = tags.write_str
+            tags.write_signature()
+            # Up to and including the "$HANDSEED" name tag
+            tags.write_str(head[:seed_start - len("  5\n")])
+            self._seed_pos = self._stream.tell() + 2 # After the 2-byte group code
+            tags.write_tag2(5, seed)
+            tags.write_str(head[seed_end + 1:])
+            return
+
+        if isinstance(output_path, (str, os.PathLike)):
+            self._stream = open(output_path, "wt", encoding=skeleton.output_encoding)
+            self._owns_stream = True
+        else:
+            self._stream = io.TextIOWrapper(output_path, encoding=skeleton.output_encoding, newline="\n")
+            self._owns_stream = False
+        self._write = self._stream.write
+        self._write(head[:seed_start])
+        self._seed_pos = self._stream.tell()
+        self._write(seed)
+        self._write(head[seed_end:])
+
+    def _format_handle(self, handle):
+        return f"{handle:X}"
+
+    def _begin_entity(self, dxftype, layer, subclass):
+        handle = self._format_handle(self._next_handle)
+        self._next_handle += 1
+        self.count += 1
+        self._write(
+            f"  0\n{dxftype}\n  5\n{handle}\n330\n{self.owner}\n"
+            f"100\nAcDbEntity\n  8\n{layer}\n100\n{subclass}\n"
+        )
+
+    def add_line(self, start, end, dxfattribs=None):
+        layer = (dxfattribs or {}).get('layer', '0')
+        self._begin_entity("LINE", layer, "AcDbLine")
+        self._write(
+            f" 10\n{float(start[0])}\n 20\n{float(start[1])}\n 30\n0.0\n"
+            f" 11\n{float(end[0])}\n 21\n{float(end[1])}\n 31\n0.0\n"
+        )
+
+    def add_spline(self, fit_points=None, degree=3, dxfattribs=None):
+        layer = (dxfattribs or {}).get('layer', '0')
+        fit_points = list(fit_points or [])
+        self._begin_entity("SPLINE", layer, "AcDbSpline")
+        self._write(f" 70\n0\n 71\n{degree}\n 72\n0\n 73\n0\n 74\n{len(fit_points)}\n")
+        self._write("".join(
+            f" 11\n{float(p[0])}\n 21\n{float(p[1])}\n 31\n0.0\n" for p in fit_points
+        ))
+
+    def add_lwpolyline(self, points, format="xy", close=False, dxfattribs=None):
+        layer = (dxfattribs or {}).get('layer', '0')
+        points = list(points)
+        self._begin_entity("LWPOLYLINE", layer, "AcDbPolyline")
+        self._write(f" 90\n{len(points)}\n 70\n{1 if close else 0}\n")
+        self._write("".join(
+            f" 10\n{float(p[0])}\n 20\n{float(p[1])}\n" for p in points
+        ))
+
+    def _write_circle(self, dxftype, center, radius, dxfattribs):
+        layer = (dxfattribs or {}).get('layer', '0')
+        self._begin_entity(dxftype, layer, "AcDbCircle")
+        self._write(
+            f" 10\n{float(center[0])}\n 20\n{float(center[1])}\n 30\n0.0\n"
+            f" 40\n{float(radius)}\n"
+        )
+
+    def add_circle(self, center, radius, dxfattribs=None):
+        self._write_circle("CIRCLE", center, radius, dxfattribs)
+
+    def add_arc(self, center, radius, start_angle, end_angle, dxfattribs=None):
+        # An ARC is a circle with an extra subclass for its angles
+        self._write_circle("ARC", center, radius, dxfattribs)
+        self._write(f"100\nAcDbArc\n 50\n{float(start_angle)}\n 51\n{float(end_angle)}\n")
+
+    def add_mtext(self, text, dxfattribs=None):
+        dxfattribs = dxfattribs or {}
+        insert = dxfattribs.get('insert', (0, 0))
+        self._begin_entity("MTEXT", dxfattribs.get('layer', '0'), "AcDbMText")
+        self._write(
+            f" 10\n{float(insert[0])}\n 20\n{float(insert[1])}\n 30\n0.0\n"
+            f" 40\n{float(dxfattribs.get('char_height', 2.5))}\n"
+            f" 71\n{dxfattribs.get('attachment_point', 1)}\n"
+        )
+        # Text longer than 250 chars is split into leading group 3 chunks
+        text = text.replace("\n", "\\P")
+        while len(text) > 250:
+            self._write(f"  3\n{text[:250]}\n")
+            text = text[250:]
+        self._write(f"  1\n{text}\n")
+
+    def add_text(self, text, dxfattribs=None):
+        dxfattribs = dxfattribs or {}
+        insert = dxfattribs.get('insert', (0, 0))
+        self._begin_entity("TEXT", dxfattribs.get('layer', '0'), "AcDbText")
+        self._write(
+            f" 10\n{float(insert[0])}\n 20\n{float(insert[1])}\n 30\n0.0\n"
+            f" 40\n{float(dxfattribs.get('height', 2.5))}\n"
+            f"  1\n{text}\n100\nAcDbText\n"
+        )
+
+    def close(self):
+        """Writes the remaining sections and patches $HANDSEED."""
+        if self._stream is None or self._stream.closed:
+            return
+        self._write(self._tail)
+        self._stream.seek(self._seed_pos)
+        seed = self._format_handle(self._next_handle).rjust(HANDSEED_WIDTH, "0")
+        self._stream.write(seed.encode("ascii") if self.binary else seed)
+        if self._owns_stream:
+            self._stream.close()
+        elif self.binary:
+            self._stream.seek(0, io.SEEK_END)
+            self._stream = None
+        else:
+            # Hand the buffer back to the caller, positioned at its end
+            self._stream.seek(0, io.SEEK_END)
+            self._stream.flush()
+            self._stream.detach()
+            self._stream = None
+
+    def abort(self):
+        """
+        Stops writing after an error without finishing the file. A file opened
+        by the writer is removed, so no truncated DXF is left behind.
+        """
+        if self._stream is None:
+            return
+        if self._owns_stream:
+            self._stream.close()
+            try:
+                os.remove(self.output_path)
+            except FileNotFoundError:
+                pass
+        elif not self.binary and not self._stream.closed:
+            # Leave the caller's buffer open
+            self._stream.detach()
+        self._stream = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
@@ -0,0 +1,279 @@
+import math
+
+import numpy as np
+
+try:
+    from . import curves as curve_fitting
+except ImportError:
+    import curves as curve_fitting
+
+# Number of points stored per drawing command ("re" is expanded to a closed loop)
+ITEM_POINTS = {"l": 2, "c": 4, "re": 5}
+
+
+class PageItems:
+    """
+    Flat, array-backed view of the line, curve and rect items of a page.
+    All vertices live in a single (N, 2) float array so they can be
+    transformed in one vectorized operation.
+    """
+
+    def __init__(self, cmds, path_ids, counts, points):
+        self.cmds = cmds
+        self.path_ids = path_ids
+        self.counts = counts
+        self.points = points
+
+    def __len__(self):
+        return len(self.cmds)
+
+    def __iter__(self):
+        """Yields (cmd, path_id, points) per item, points as a list of [x, y]."""
+        coords = self.points.tolist()
+        start = 0
+        for cmd, path_id, count in zip(self.cmds, self.path_ids, self.counts):
+            yield cmd, path_id, coords[start:start + count]
+            start += count
+
+    def subset(self, mask):
+        """Returns a copy with only the items where mask (one bool per item) is True."""
+        mask = np.asarray(mask, dtype=bool)
+        keep = mask.nonzero()[0].tolist()
+        return PageItems([self.cmds[i] for i in keep], [self.path_ids[i] for i in keep],
+                         [self.counts[i] for i in keep], self.points[np.repeat(mask, self.counts)])
+
+
+def get_paths(page, extractor="cdrawings"):
+    """
+    Returns the drawing paths of page in get_drawings() layout.
+    "cdrawings" reads them with page.get_cdrawings(), which gives plain tuples
+    instead of Point/Rect objects and skips the fill details; it falls back to
+    get_drawings() on PyMuPDF versions without it.
+    """
+    if extractor == "cdrawings" and hasattr(page, "get_cdrawings"):
+        return page.get_cdrawings()
+    return page.get_drawings()
+
+
+def collect_items(paths):
+    """
+    Collects the vertices of all "l", "c" and "re" items of get_drawings() paths.
+    :param paths: Output of get_paths(), items may hold Point/Rect objects or tuples.
+    :return: PageItems in drawing order.
+    """
+    cmds = []
+    path_ids = []
+    counts = []
+    coords = []
+    for path_id, path in enumerate(paths):
+        for item in path["items"]:
+            cmd = item[0]
+            if cmd == "l":
+                coords.extend(item[1])
+                coords.extend(item[2])
+            elif cmd == "c":
+                for p in item[1:5]:
+                    coords.extend(p)
+            elif cmd == "re":
+                x0, y0, x1, y1 = item[1]
+                coords.extend((x0, y0, x1, y0, x1, y1, x0, y1, x0, y0)) # Closed loop
+            else:
+                continue
+            cmds.append(cmd)
+            path_ids.append(path_id)
+            counts.append(ITEM_POINTS[cmd])
+
+    return PageItems(cmds, path_ids, counts, as_points(coords))
+
+
+def clip_box(page, clip):
+    """
+    Returns the clip region of page as (x0, y0, x1, y1) in the unrotated page
+    coordinates of get_drawings() and get_text(), or None to keep everything.
+    :param clip: None, "cropbox" for the visible page area, or an (x0, y0, x1, y1)
+                 box in PDF points from the top-left corner of the unrotated page.
+    """
+    if clip is None:
+        return None
+    if clip == "cropbox":
+        return tuple(page.rect * page.derotation_matrix)
+    return tuple(clip)
+
+
+def cull_paths(paths, box):
+    """Keeps the get_drawings() paths whose bounding rect touches box (x0, y0, x1, y1)."""
+    x0, y0, x1, y1 = box
+    kept = []
+    for path in paths:
+        # A Rect or, from get_cdrawings(), a tuple
+        left, top, right, bottom = path["rect"]
+        if right >= x0 and left <= x1 and bottom >= y0 and top <= y1:
+            kept.append(path)
+    return kept
+
+
+def as_points(coords):
+    """Builds an (N, 2) float array from a flat or nested sequence of coordinates."""
+    return np.array(coords, dtype=np.float64).reshape(-1, 2)
+
+
+def page_matrix(page_height, x_offset=0):
+    """
+    Returns the (a, b, c, d, e, f) matrix that flips PDF page coordinates
+    (origin top-left) to DXF coordinates (origin bottom-left).
+    """
+    return (1.0, 0.0, 0.0, -1.0, float(x_offset), float(page_height))
+
+
+def transform_points(points, matrix):
+    """
+    Applies an affine matrix (a, b, c, d, e, f), as used by PyMuPDF, to an
+    (N, 2) array of points: x' = a*x + c*y + e, y' = b*x + d*y + f.
+    """
+    a, b, c, d, e, f = matrix
+    x = points[:, 0]
+    y = points[:, 1]
+    if (a, b, c, d) == (1.0, 0.0, 0.0, -1.0):
+        # Plain Y-flip (the default), no need for the full multiply-add
+        return np.column_stack((x + e, f - y))
+    return np.column_stack((a * x + c * y + e, b * x + d * y + f))
+
+
+def _close_enough(p, q, tolerance):
+    return abs(p[0] - q[0]) <= tolerance and abs(p[1] - q[1]) <= tolerance
+
+
+def to_entities(items, chain_tolerance=None, arc_tolerance=None):
+    """
+    Turns transformed PageItems into DXF geometry.
+    Yields (kind, points, extra) tuples:
+      "line", "spline": extra is None
+      "polyline": extra is the closed flag
+      "circle": points is [center], extra is the radius
+      "arc": points is [center], extra is (radius, start_angle, end_angle)
+    :param items: PageItems, already transformed.
+    :param chain_tolerance: If set, consecutive "l" items of the same path whose
+                            end and start points lie within this distance are joined
+                            into one polyline, closed when the chain returns to its start.
+    :param arc_tolerance: If set, runs of "c" items of the same path that follow a
+                          circle within this distance become circles or arcs.
+    """
+    chain = []
+    chain_path = None
+    curves = []
+    curves_path = None
+
+    def flush():
+        if len(chain) == 2:
+            yield "line", list(chain), None
+        elif len(chain) > 2:
+            if len(chain) > 3 and _close_enough(chain[0], chain[-1], chain_tolerance):
+                yield "polyline", chain[:-1], True
+            else:
+                yield "polyline", list(chain), False
+        chain.clear()
+        if curves:
+            yield from curve_fitting.fit_arcs(curves, arc_tolerance)
+            curves.clear()
+
+    for cmd, path_id, points in items:
+        if cmd == "l" and chain_tolerance is not None:
+            if not (chain and path_id == chain_path and _close_enough(chain[-1], points[0], chain_tolerance)):
+                yield from flush()
+                chain.append(points[0])
+                chain_path = path_id
+            chain.append(points[1])
+            continue
+        if cmd == "c" and arc_tolerance is not None:
+            if curves_path != path_id:
+                yield from flush()
+                curves_path = path_id
+            curves.append(points)
+            continue
+
+        yield from flush()
+        if cmd == "l":
+            yield "line", points, None
+        elif cmd == "c":
+            yield "spline", points, None
+        elif cmd == "re":
+            yield "polyline", points, False
+
+    yield from flush()
+
+
+class DuplicateFilter:
+    """
+    Drops repeated geometry using a spatial hash over quantized start points.
+
+    Each kept entity is stored in the grid cell of its first point. A new
+    entity is compared, in both directions, against the entities in the 3x3
+    cells around its first point, so the work per entity stays constant and
+    the whole pass runs in linear time. Closed polylines are compared from a
+    common start vertex.
+    """
+
+    def __init__(self, tolerance):
+        self.tolerance = tolerance
+        self.cells = {}
+        self.dropped = 0
+
+    def _cell(self, point):
+        return (math.floor(point[0] / self.tolerance), math.floor(point[1] / self.tolerance))
+
+    def _matches(self, points, other):
+        tolerance = self.tolerance
+        for p, q in zip(points, other):
+            if not _close_enough(p, q, tolerance):
+                return False
+        return True
+
+    def _find(self, kind, points, extra):
+        cx, cy = self._cell(points[0])
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for other_kind, other, other_extra in self.cells.get((cx + dx, cy + dy), ()):
+                    if (other_kind == kind and len(other) == len(points)
+                            and self._same_extra(extra, other_extra)
+                            and self._matches(points, other)):
+                        return True
+        return False
+
+    def _same_extra(self, extra, other):
+        """Compares closed flags, radii and arc angles."""
+        if isinstance(extra, tuple):
+            return all(abs(a - b) <= self.tolerance for a, b in zip(extra, other))
+        if isinstance(extra, float):
+            return abs(extra - other) <= self.tolerance
+        return extra == other
+
+    def _orientations(self, kind, points, extra):
+        """
+        Returns (forward, backward, extra): points in both directions. Closed
+        polylines, whether a rect (open flag, last point repeats the first) or
+        a closed chain, become the same closed ring, starting at its lowest
+        vertex, so a ring drawn from another corner or operator compares equal.
+        """
+        loop = len(points) > 3 and _close_enough(points[0], points[-1], self.tolerance)
+        if kind != "polyline" or not (extra is True or loop):
+            return points, points[::-1], extra
+        ring = points[:-1] if loop else points
+        start = min(range(len(ring)), key=lambda i: self._cell(ring[i]))
+        forward = ring[start:] + ring[:start]
+        backward = forward[:1] + forward[:0:-1]
+        return forward, backward, True
+
+    def is_duplicate(self, kind, points, extra=None):
+        """Returns True if the geometry was seen before, otherwise records it."""
+        forward, backward, extra = self._orientations(kind, points, extra)
+        if self._find(kind, forward, extra) or self._find(kind, backward, extra):
+            self.dropped += 1
+            return True
+        self.cells.setdefault(self._cell(forward[0]), []).append((kind, forward, extra))
+        return False
+
+    def filter(self, entities):
+        """Passes through (kind, points, extra) entities that are not duplicates."""
+        for kind, points, extra in entities:
+            if not self.is_duplicate(kind, points, extra):
+                yield kind, points, extra
@@ -0,0 +1,101 @@
+import os
+import struct
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+try:
+    from . import geometry
+except ImportError:
+    import geometry
+
+# Images waiting for the writer thread before the converting thread blocks
+MAX_PENDING = 4
+
+# PNG color type by number of channels: gray, gray + alpha, RGB, RGB + alpha
+PNG_COLOR_TYPES = {1: 0, 2: 4, 3: 2, 4: 6}
+
+
+def image_directory(output_path):
+    """Sidecar directory of the images of a conversion: plans.dxf -> plans_images"""
+    return os.path.splitext(output_path)[0] + "_images"
+
+
+def placement(transform, width, height, matrix):
+    """
+    Returns (insert, u_pixel, v_pixel) of a DXF IMAGE: its lower-left corner and
+    the vectors of one pixel along the image rows and up its columns.
+    :param transform: get_image_info() "transform", mapping the unit square (origin
+                      at the image's top-left corner) to page coordinates.
+    :param width: Image width in pixels.
+    :param height: Image height in pixels.
+    :param matrix: Page to DXF matrix, as used for the page's geometry.
+    """
+    a, b, c, d, e, f = transform
+    # Top-left, top-right and bottom-left corners of the image on the page
+    corners = geometry.as_points([(e, f), (a + e, b + f), (c + e, d + f)])
+    top_left, top_right, bottom_left = geometry.transform_points(corners, matrix).tolist()
+    u_pixel = ((top_right[0] - top_left[0]) / width, (top_right[1] - top_left[1]) / width)
+    v_pixel = ((top_left[0] - bottom_left[0]) / height, (top_left[1] - bottom_left[1]) / height)
+    return bottom_left, u_pixel, v_pixel
+
+
+def encode_png(width, height, channels, samples):
+    """PNG file content of 8-bit samples, row by row without padding."""
+    rows = np.frombuffer(samples, dtype=np.uint8).reshape(height, width * channels)
+    # Filter type 0 (none) in front of every row
+    raw = np.hstack((np.zeros((height, 1), dtype=np.uint8), rows)).tobytes()
+
+    def chunk(kind, data):
+        return (struct.pack(">I", len(data)) + kind + data
+                + struct.pack(">I", zlib.crc32(kind + data) & 0xffffffff))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, PNG_COLOR_TYPES[channels], 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw, 6))
+            + chunk(b"IEND", b""))
+
+
+def _write(path, data=None, png=None):
+    if png is not None:
+        data = encode_png(*png)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+class ImageWriter:
+    """
+    Writes extracted images to a sidecar directory on a background thread.
+
+    PyMuPDF must only be used from one thread, so the converting thread reads
+    each image from the PDF and hands over bytes. PNG encoding (zlib releases
+    the GIL) and file writes then overlap with the vector conversion.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.count = 0
+        self._pool = ThreadPoolExecutor(max_workers=1)
+        self._pending = deque()
+        os.makedirs(directory, exist_ok=True)
+
+    def add(self, name, data=None, png=None):
+        """
+        Queues one image file.
+        :param data: Ready file content, e.g. a JPEG stream.
+        :param png: Or (width, height, channels, samples) to encode as PNG.
+        """
+        while len(self._pending) >= MAX_PENDING:
+            # Bounds the images held in memory, raises errors of earlier writes
+            self._pending.popleft().result()
+        self._pending.append(self._pool.submit(_write, os.path.join(self.directory, name), data, png))
+        self.count += 1
+
+    def close(self):
+        """Waits for the queued images and stops the thread."""
+        try:
+            while self._pending:
+                self._pending.popleft().result()
+        finally:
+            self._pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import tempfile
+
+try:
+    from . import cache
+except ImportError:
+    import cache
+
+STATE_SUFFIX = ".pdf2dxf.json"
+
+
+def state_path(output_path):
+    """Sidecar state file of a conversion: output.dxf -> output.pdf2dxf.json"""
+    return os.path.splitext(output_path)[0] + STATE_SUFFIX
+
+
+def _file_info(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return {'size': stat.st_size, 'mtime': stat.st_mtime_ns}
+
+
+def _sha256(path=None, data=None):
+    digest = hashlib.sha256()
+    if data is not None:
+        digest.update(data)
+        return digest.hexdigest()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ConversionState:
+    """
+    Records, next to the outputs, what each page DXF was generated from: the
+    source PDF (size, mtime and hash), the conversion options, the converter
+    version and a fingerprint of the page content.
+
+    A page is current if its DXF is unchanged since it was written and either
+    the source PDF has the same size and mtime, the same hash (e.g. after a
+    copy), or the page itself has the same fingerprint.
+    Changed options or converter versions make every page stale.
+    """
+
+    def __init__(self, path, pdf_path, options, pdf_bytes=None):
+        """
+        :param path: State file path, see state_path().
+        :param pdf_path: Source PDF path.
+        :param options: Conversion options, as in PDF2DXFConverter._page_options().
+        :param pdf_bytes: Source PDF content when it is held in memory.
+        """
+        self.path = path
+        self.pdf_path = pdf_path
+        self.pdf_bytes = pdf_bytes
+        self.options = options
+        self.pages = {}
+        self._sha256 = None
+        # Pages checked or converted in this run
+        self._confirmed = set()
+
+        if pdf_bytes is not None:
+            self.source = {'size': len(pdf_bytes), 'mtime': None}
+        else:
+            self.source = _file_info(pdf_path)
+
+        state = self._load()
+        if state and state.get('version') == cache.CONVERTER_VERSION and state.get('options') == options:
+            self.pages = state['pages']
+            self.source_changed = not self._same_source(state['source'])
+        else:
+            self.source_changed = True
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _source_hash(self):
+        if self._sha256 is None:
+            self._sha256 = _sha256(self.pdf_path, self.pdf_bytes)
+        return self._sha256
+
+    def _same_source(self, previous):
+        # Size and mtime avoid hashing the PDF on every run
+        if self.source['size'] != previous['size']:
+            return False
+        if self.source['mtime'] is not None and self.source['mtime'] == previous['mtime']:
+            self._sha256 = previous['sha256']
+            return True
+        return self._source_hash() == previous['sha256']
+
+    def is_current(self, doc, page_num, output_path):
+        """True if output_path is an up-to-date conversion of page page_num."""
+        record = self.pages.get(str(page_num))
+        if not record or record['output'] != os.path.abspath(output_path):
+            return False
+        if _file_info(output_path) != record['dxf']:
+            # Deleted or edited since it was written
+            return False
+        if self.source_changed and record['fingerprint'] != cache.page_fingerprint(doc, doc[page_num]):
+            return False
+        self._confirmed.add(str(page_num))
+        return True
+
+    def record(self, page_num, output_path, fingerprint):
+        """
+        Marks page page_num as converted to output_path.
+        :param fingerprint: cache.page_fingerprint() of the converted page.
+        """
+        self.pages[str(page_num)] = {
+            'output': os.path.abspath(output_path),
+            'dxf': _file_info(output_path),
+            'fingerprint': fingerprint,
+        }
+        self._confirmed.add(str(page_num))
+
+    def save(self):
+        """Atomically writes the state file."""
+        if self.source_changed:
+            # Pages not checked against the new source must not pass as current later
+            self.pages = {key: value for key, value in self.pages.items() if key in self._confirmed}
+        state = {
+            'version': cache.CONVERTER_VERSION,
+            'options': self.options,
+            'source': dict(self.source, sha256=self._source_hash()),
+            'pages': self.pages,
+        }
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(state, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
@@ -0,0 +1,155 @@
+import cProfile
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import psutil
+except ImportError:
+    # Optional, /proc/self/statm covers Linux without it
+    psutil = None
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = None
+
+
+def current_memory():
+    """
+    Current memory use in bytes: traced Python memory when tracemalloc is
+    running, otherwise the resident set size where the OS exposes it.
+    Returns None if neither is available.
+    """
+    if tracemalloc.is_tracing():
+        return tracemalloc.get_traced_memory()[0]
+    return resident_memory()
+
+
+def resident_memory():
+    """
+    Resident set size of the process in bytes, including MuPDF's and numpy's
+    native allocations, whether or not tracemalloc runs. Uses psutil if it is
+    installed, otherwise /proc/self/statm. Returns None if neither is available.
+    """
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    if _PAGE_SIZE is None:
+        return None
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class Stage:
+    """Measurements of one stage of one page. Set `count` to record processed items."""
+
+    def __init__(self, name):
+        self.name = name
+        self.seconds = 0.0
+        self.count = None
+        self.memory_delta = None
+
+    def as_dict(self):
+        return {'seconds': self.seconds, 'count': self.count, 'memory_delta': self.memory_delta}
+
+
+# Stand-in used when profiling is disabled
+_NULL_STAGE = Stage(None)
+
+
+class ConversionProfile:
+    """
+    Collects per-page, per-stage wall time, item counts and memory deltas.
+    Stages are recorded with:
+
+        with profile.stage(page_num, "get_drawings") as stage:
+            paths = page.get_drawings()
+            stage.count = len(paths)
+
+    A stage that runs several times for a page, e.g. once per block in
+    single-file output, adds up its seconds, counts and memory deltas.
+    """
+
+    def __init__(self):
+        self.pages = {}
+
+    @contextmanager
+    def stage(self, page_num, name):
+        stage = Stage(name)
+        memory_before = current_memory()
+        start = time.perf_counter()
+        try:
+            yield stage
+        finally:
+            stage.seconds = time.perf_counter() - start
+            memory_after = current_memory()
+            if memory_before is not None and memory_after is not None:
+                stage.memory_delta = memory_after - memory_before
+            self._add(page_num, name, stage.as_dict())
+
+    def _add(self, page_num, name, values):
+        stages = self.pages.setdefault(page_num, {})
+        if name not in stages:
+            stages[name] = dict(values)
+            return
+        record = stages[name]
+        for key in ('seconds', 'count', 'memory_delta'):
+            if record[key] is None:
+                record[key] = values[key]
+            elif values[key] is not None:
+                record[key] += values[key]
+
+    def merge(self, pages):
+        """Adds pages recorded elsewhere, e.g. by a worker process."""
+        for page_num, stages in pages.items():
+            for name, values in stages.items():
+                self._add(page_num, name, values)
+
+    def report(self):
+        """
+        Structured report:
+        {'pages': {page_num: {stage: {seconds, count, memory_delta}}},
+         'totals': {stage: {seconds, count}}}
+        """
+        totals = {}
+        for stages in self.pages.values():
+            for name, values in stages.items():
+                total = totals.setdefault(name, {'seconds': 0.0, 'count': 0})
+                total['seconds'] += values['seconds']
+                total['count'] += values['count'] or 0
+        return {'pages': dict(sorted(self.pages.items())), 'totals': totals}
+
+    def summary(self):
+        """Human readable table of the totals per stage."""
+        totals = self.report()['totals']
+        overall = sum(values['seconds'] for values in totals.values()) or 1.0
+        lines = [f"{'Stage':<16}{'Seconds':>10}{'Share':>8}{'Items':>10}"]
+        for name, values in totals.items():
+            lines.append(f"{name:<16}{values['seconds']:>10.3f}{100 * values['seconds'] / overall:>7.1f}%"
+                         f"{values['count']:>10}")
+        return "\n".join(lines)
+
+
+def stage(profile, page_num, name):
+    """Returns profile.stage(...), or a no-op context when profile is None."""
+    if profile is None:
+        return _null_stage()
+    return profile.stage(page_num, name)
+
+
+@contextmanager
+def _null_stage():
+    yield _NULL_STAGE
+
+
+def run_with_cprofile(func, dump_path, *args, **kwargs):
+    """Runs func under cProfile and dumps the stats to dump_path for pstats/snakeviz."""
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, *args, **kwargs)
+    finally:
+        profiler.dump_stats(dump_path)
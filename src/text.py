@@ -0,0 +1,52 @@
+TEXT_ENTITIES = ("mtext", "text")
+
+
+def _can_merge(previous, span):
+    """Spans merge when they share font and size and nearly touch."""
+    if previous["font"] != span["font"] or previous["size"] != span["size"]:
+        return False
+    # Allow up to one em of horizontal gap between the spans
+    gap = span["bbox"][0] - previous["bbox"][2]
+    return -span["size"] <= gap <= span["size"]
+
+
+def collect_spans(text_dict, merge=False):
+    """
+    Collects the non-blank text spans of a get_text("dict") result.
+    :param text_dict: Output of page.get_text("dict").
+    :param merge: Merge adjacent spans of the same line that share font and size
+                  into one span, placed at the origin of the first.
+    :return: List of dicts with "text", "size", "font", "origin" and "bbox".
+    """
+    spans = []
+    for block in text_dict.get("blocks", []):
+        if block["type"] != 0: # Text block
+            continue
+        for line in block["lines"]:
+            line_spans = []
+            for span in line["spans"]:
+                if merge and line_spans and _can_merge(line_spans[-1], span):
+                    previous = line_spans[-1]
+                    previous["text"] += span["text"]
+                    previous["bbox"] = (previous["bbox"][0], min(previous["bbox"][1], span["bbox"][1]),
+                                        span["bbox"][2], max(previous["bbox"][3], span["bbox"][3]))
+                    continue
+                line_spans.append({
+                    "text": span["text"],
+                    "size": span["size"],
+                    "font": span["font"],
+                    "origin": span["origin"],
+                    "bbox": tuple(span["bbox"]),
+                })
+            spans.extend(span for span in line_spans if span["text"].strip())
+    return spans
+
+
+def count_spans(text_dict):
+    """Number of non-blank spans before merging."""
+    return sum(
+        1
+        for block in text_dict.get("blocks", []) if block["type"] == 0
+        for line in block["lines"]
+        for span in line["spans"] if span["text"].strip()
+    )
@@ -1,9 +1,9 @@
 import streamlit as st
+import hashlib
+import io
 import os
-import tempfile
-import shutil
 import sys
-from zipfile import ZipFile
+from zipfile import ZipFile, ZIP_DEFLATED
 
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
@@ -39,64 +39,99 @@ st.markdown("""
 Convert your PDF drawings to DXF format for CAD software.
 """)
 
+
+@st.cache_data(max_entries=8, ttl=3600, show_spinner=False)
+def convert_upload(content_hash, file_name, options, _data):
+    """
+    Converts an upload and returns (download_name, data, mime, file_count).
+    Memoized on the content hash, file name and options, so reruns and repeat
+    downloads reuse the result; _data is excluded from Streamlit's hashing.
+    """
+    output_filename = os.path.splitext(file_name)[0] + ".dxf"
+    # Run conversion in memory, no temporary files involved
+    converter = PDF2DXFConverter.from_bytes(_data, file_name, **dict(options))
+    converter.verbose = False
+    generated_files = converter.convert_to_bytes(output_filename)
+
+    if len(generated_files) == 1:
+        name, data = generated_files[0]
+        return name, data, "application/dxf", 1
+
+    # Multiple files - Zip them in memory
+    zip_buffer = io.BytesIO()
+    with ZipFile(zip_buffer, 'w', ZIP_DEFLATED) as zipObj:
+        for name, data in generated_files:
+            zipObj.writestr(name, data)
+    return "converted_files.zip", zip_buffer.getvalue(), "application/zip", len(generated_files)
+
+
+def upload_hash(uploaded_file):
+    """SHA-256 of the upload, computed once per upload and kept in the session."""
+    hashes = st.session_state.setdefault("upload_hashes", {})
+    if uploaded_file.file_id not in hashes:
+        hashes[uploaded_file.file_id] = hashlib.sha256(uploaded_file.getvalue()).hexdigest()
+    return hashes[uploaded_file.file_id]
+
+
 uploaded_file = st.file_uploader("Choose a PDF file", type="pdf")
 
+with st.expander("Options"):
+    options = {
+        'chain_tolerance': 0.01 if st.checkbox("Join connected lines into polylines") else None,
+        'dedup_tolerance': 0.01 if st.checkbox("Remove duplicate geometry") else None,
+        'arc_tolerance': 0.01 if st.checkbox("Convert circles and arcs to CIRCLE/ARC") else None,
+        'merge_text': st.checkbox("Merge text spans"),
+        'text_entity': "text" if st.checkbox("Use single-line TEXT instead of MTEXT") else "mtext",
+        'symbol_blocks': st.checkbox("Draw repeated symbols as blocks"),
+    }
+    region = st.selectbox("Region", ["Whole page content", "Page area (CropBox) only", "Custom box"])
+    options['clip'] = None
+    if region == "Page area (CropBox) only":
+        options['clip'] = "cropbox"
+    elif region == "Custom box":
+        box = st.text_input("Box as x0,y0,x1,y1 in PDF points from the top-left corner")
+        if box:
+            try:
+                options['clip'] = tuple(float(v) for v in box.split(","))
+            except ValueError:
+                st.error("The box must be four comma-separated numbers.")
+options_key = tuple(sorted(options.items()))
+
 if uploaded_file is not None:
     st.info(f"File uploaded: {uploaded_file.name}")
+    request_key = (upload_hash(uploaded_file), uploaded_file.name, options_key)
     
     if st.button("Convert to DXF"):
+        st.session_state["converted"] = request_key
+
+    # Keep showing the result on reruns (e.g. after clicking download)
+    if st.session_state.get("converted") == request_key:
         with st.spinner("Converting..."):
-            # Create a temporary directory
-            with tempfile.TemporaryDirectory() as tmpdirname:
-                # Save uploaded file
-                input_path = os.path.join(tmpdirname, uploaded_file.name)
-                with open(input_path, "wb") as f:
-                    f.write(uploaded_file.getbuffer())
-                
-                # Define output path
-                output_filename = os.path.splitext(uploaded_file.name)[0] + ".dxf"
-                output_path = os.path.join(tmpdirname, output_filename)
-                
-                try:
-                    # Run conversion
-                    converter = PDF2DXFConverter(input_path)
-                    converter.convert(output_path)
-                    
-                    # Check what was generated (handle multi-page)
-                    generated_files = [f for f in os.listdir(tmpdirname) if f.endswith(".dxf")]
-                    
-                    if not generated_files:
-                        st.error("No DXF files were generated.")
-                    elif len(generated_files) == 1:
-                        # Single file download
-                        file_path = os.path.join(tmpdirname, generated_files[0])
-                        with open(file_path, "rb") as f:
-                            st.download_button(
-                                label="Download DXF",
-                                data=f,
-                                file_name=generated_files[0],
-                                mime="application/dxf"
-                            )
-                        st.success("Conversion successful!")
-                    else:
-                        # Multiple files - Zip them
-                        zip_filename = "converted_files.zip"
-                        zip_path = os.path.join(tmpdirname, zip_filename)
-                        with ZipFile(zip_path, 'w') as zipObj:
-                            for file in generated_files:
-                                zipObj.write(os.path.join(tmpdirname, file), file)
-                        
-                        with open(zip_path, "rb") as f:
-                            st.download_button(
-                                label="Download All (ZIP)",
-                                data=f,
-                                file_name=zip_filename,
-                                mime="application/zip"
-                            )
-                        st.success(f"Conversion successful! Generated {len(generated_files)} files.")
-                        
-                except Exception as e:
-                    st.error(f"An error occurred: {e}")
+            try:
+                file_name, data, mime, file_count = convert_upload(
+                    request_key[0], uploaded_file.name, options_key, uploaded_file.getvalue()
+                )
+            except Exception as e:
+                st.error(f"An error occurred: {e}")
+                st.session_state.pop("converted", None)
+            else:
+                if file_count == 1:
+                    # Single file download
+                    st.download_button(
+                        label="Download DXF",
+                        data=data,
+                        file_name=file_name,
+                        mime=mime
+                    )
+                    st.success("Conversion successful!")
+                else:
+                    st.download_button(
+                        label="Download All (ZIP)",
+                        data=data,
+                        file_name=file_name,
+                        mime=mime
+                    )
+                    st.success(f"Conversion successful! Generated {file_count} files.")
 
 st.markdown("---")
 st.markdown("Powered by **PyMuPDF** and **ezdxf**.")
@@ -0,0 +1,89 @@
+import os
+import sys
+import unittest
+
+# Add the repository root to path so we can import src
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src import curves, geometry
+
+RECT = [[0.0, 0.0], [40.0, 0.0], [40.0, 20.0], [0.0, 20.0], [0.0, 0.0]]
+
+
+def entities(items, chain_tolerance=0.01):
+    """(cmd, path_id, points) items -> to_entities() output, as collect_items would build them."""
+    cmds = [cmd for cmd, _, _ in items]
+    path_ids = [path_id for _, path_id, _ in items]
+    counts = [len(points) for _, _, points in items]
+    points = geometry.as_points([p for _, _, item_points in items for p in item_points])
+    return list(geometry.to_entities(geometry.PageItems(cmds, path_ids, counts, points), chain_tolerance))
+
+
+def closed_path(corners, path_id):
+    """Line items of a closed path through corners."""
+    return [("l", path_id, [corners[i], corners[(i + 1) % len(corners)]]) for i in range(len(corners))]
+
+
+class TestDuplicateFilter(unittest.TestCase):
+    def test_rect_over_closed_path(self):
+        """A rect drawn over a closed 4-segment path of the same corners is dropped"""
+        rect = entities([("re", 0, RECT)])
+        outline = entities(closed_path(RECT[:4], 1))
+        self.assertEqual(outline[0][0], "polyline")
+        self.assertTrue(outline[0][2], "The chained path should be closed")
+
+        duplicates = geometry.DuplicateFilter(0.01)
+        self.assertEqual(len(list(duplicates.filter(outline + rect))), 1)
+        duplicates = geometry.DuplicateFilter(0.01)
+        self.assertEqual(len(list(duplicates.filter(rect + outline))), 1)
+
+    def test_closed_path_from_other_corner(self):
+        """The same closed path started at another corner and drawn backwards is dropped"""
+        corners = RECT[:4]
+        other = corners[2:] + corners[:2]
+        duplicates = geometry.DuplicateFilter(0.01)
+        kept = duplicates.filter(entities(closed_path(corners, 0)) + entities(closed_path(other[::-1], 1)))
+        self.assertEqual(len(list(kept)), 1)
+
+    def test_open_polylines_keep_their_ends(self):
+        """Open polylines through the same points but with other ends are different geometry"""
+        duplicates = geometry.DuplicateFilter(0.01)
+        self.assertFalse(duplicates.is_duplicate("polyline", [[0, 0], [10, 0], [10, 10]], False))
+        self.assertFalse(duplicates.is_duplicate("polyline", [[10, 0], [10, 10], [0, 0]], False))
+        self.assertTrue(duplicates.is_duplicate("polyline", [[10, 10], [10, 0], [0, 0]], False))
+
+
+def bezier_circle(center, radius):
+    """Control points of the usual 4-curve Bezier circle, as PDF writers draw it."""
+    k = 0.5523 * radius
+    cx, cy = center
+    return [
+        [[cx + radius, cy], [cx + radius, cy + k], [cx + k, cy + radius], [cx, cy + radius]],
+        [[cx, cy + radius], [cx - k, cy + radius], [cx - radius, cy + k], [cx - radius, cy]],
+        [[cx - radius, cy], [cx - radius, cy - k], [cx - k, cy - radius], [cx, cy - radius]],
+        [[cx, cy - radius], [cx + k, cy - radius], [cx + radius, cy - k], [cx + radius, cy]],
+    ]
+
+
+class TestArcs(unittest.TestCase):
+    def test_circles_of_any_size(self):
+        """Bezier circles become CIRCLEs with the default tolerance, also with large radii"""
+        for radius in (5.0, 60.0, 150.0, 300.0, 1000.0):
+            result = curves.fit_arcs(bezier_circle((500.0, 400.0), radius), 0.01)
+            self.assertEqual([kind for kind, _, _ in result], ["circle"], f"radius {radius}")
+            self.assertAlmostEqual(result[0][2], radius, delta=radius * 1e-3)
+
+    def test_large_arc(self):
+        """A quarter of a large Bezier circle becomes an ARC"""
+        result = curves.fit_arcs(bezier_circle((0.0, 0.0), 300.0)[:1], 0.01)
+        self.assertEqual(result[0][0], "arc")
+
+    def test_ellipse_stays_splines(self):
+        """An ellipse is not a circle, however large the tolerance allowance for its size"""
+        ellipse = [[[x, y / 2] for x, y in curve] for curve in bezier_circle((0.0, 0.0), 300.0)]
+        result = curves.fit_arcs(ellipse, 0.01)
+        self.assertEqual([kind for kind, _, _ in result], ["spline"] * 4)
+
+
+if __name__ == '__main__':
+    unittest.main()